@@ -0,0 +1,36 @@
+"""Normalize task timestamps on SQLite
+
+Revision ID: a3c8e5d1f726
+Revises: f5a3d8c2e714
+Create Date: 2026-10-17 21:42:18.905317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8e5d1f726'
+down_revision: Union[str, None] = 'f5a3d8c2e714'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    # server_default (CURRENT_TIMESTAMP) guardaba 'YYYY-MM-DD HH:MM:SS' y los
+    # valores desde Python llevan microsegundos: se unifica en el segundo formato
+    # para que las comparaciones de texto (cursores de paginación) sean exactas
+    for column in ('created_at', 'updated_at'):
+        op.execute(sa.text(
+            f"UPDATE tasks SET {column} = {column} || '.000000' WHERE length({column}) = 19"
+        ))
+
+
+def downgrade() -> None:
+    # El formato con microsegundos también es válido para la versión anterior
+    pass
@@ -1,15 +1,28 @@
 # app/api/analytics.py
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 from app.core.database import SessionLocal
 from app.models.board import Board
 from app.api.auth import get_current_user
 from app.models.user import User
 from app.core.permissions import PermissionChecker
+from app.services.analytics_cache import analytics_cache
+from app.services.analytics_executor import (
+    AnalyticsBusyError,
+    SectionTimeoutError,
+    run_board_analytics,
+    server_timing_header
+)
+from app.services.analytics_jobs import AnalyticsJobService
 from app.services.analytics_service import AnalyticsService
-from app.schemas.analytics import BoardAnalyticsResponse
+from app.schemas.analytics import (
+    AnalyticsJobResponse,
+    BoardAnalyticsResponse,
+    CumulativeFlowResponse,
+    PortfolioAnalyticsResponse
+)
 
 # ✅ Esta línea es CRÍTICA - debe estar al inicio
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
@@ -21,37 +34,22 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/boards/{board_id}", response_model=BoardAnalyticsResponse)
-def get_board_analytics(
-    board_id: int,
-    days: int = Query(30, ge=7, le=365, description="Días de historia para análisis"),
-    start_date: Optional[str] = Query(None, description="Fecha inicio (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="Fecha fin (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Obtener analytics completo de un tablero con filtros de fecha
-    
-    - **board_id**: ID del tablero
-    - **days**: Días de historia (default: 30, min: 7, max: 365)
-    - **start_date**: Fecha de inicio del filtro (opcional, formato: YYYY-MM-DD)
-    - **end_date**: Fecha de fin del filtro (opcional, formato: YYYY-MM-DD)
-    """
-    
-    # Verificar que el tablero existe
+def _get_viewable_board(board_id: int, db: Session, current_user: User) -> Board:
+    """Tablero existente y visible para el usuario (404/403 en caso contrario)"""
     board = db.query(Board).filter(Board.id == board_id).first()
     if not board:
         raise HTTPException(status_code=404, detail="Tablero no encontrado")
     
-    # Verificar permisos
     if not PermissionChecker.can_view_board(current_user, board, db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permisos para ver este tablero"
         )
     
-    # Parsear fechas si se proporcionan
+    return board
+
+def _parse_date_range(start_date: Optional[str], end_date: Optional[str]):
+    """Parsear y validar el rango de fechas (YYYY-MM-DD) de los filtros"""
     parsed_start_date = None
     parsed_end_date = None
     
@@ -82,30 +80,165 @@ def get_board_analytics(
             detail="La fecha de inicio no puede ser mayor que la fecha de fin"
         )
     
-    # Calcular métricas
-    overview = AnalyticsService.get_board_overview(board_id, db)
-    productivity = AnalyticsService.get_productivity_metrics(board_id, db, days)
-    bottlenecks = AnalyticsService.get_bottlenecks(board_id, db)
-    workload = AnalyticsService.get_workload_distribution(board_id, db)
-    time_in_states = AnalyticsService.get_time_in_states(board_id, db)
-    tasks_by_state = AnalyticsService.get_tasks_by_state(
-        board_id, 
-        db, 
-        parsed_start_date, 
-        parsed_end_date
+    return parsed_start_date, parsed_end_date
+
+@router.get("/portfolio", response_model=PortfolioAnalyticsResponse)
+def get_portfolio_analytics(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Overview y carga de trabajo de todos los tableros accesibles
+    
+    Devuelve una fila por tablero más los totales del portafolio. Las
+    métricas se calculan con consultas agrupadas por tablero.
+    """
+    boards = PermissionChecker.get_user_boards(current_user, db)
+    return AnalyticsService.get_portfolio(boards, db)
+
+@router.get("/boards/{board_id}", response_model=BoardAnalyticsResponse)
+def get_board_analytics(
+    board_id: int,
+    response: Response,
+    days: int = Query(30, ge=7, le=365, description="Días de historia para análisis"),
+    start_date: Optional[str] = Query(None, description="Fecha inicio (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Fecha fin (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Obtener analytics completo de un tablero con filtros de fecha
+    
+    - **board_id**: ID del tablero
+    - **days**: Días de historia (default: 30, min: 7, max: 365)
+    - **start_date**: Fecha de inicio del filtro (opcional, formato: YYYY-MM-DD)
+    - **end_date**: Fecha de fin del filtro (opcional, formato: YYYY-MM-DD)
+    """
+    
+    _get_viewable_board(board_id, db, current_user)
+    parsed_start_date, parsed_end_date = _parse_date_range(start_date, end_date)
+    
+    # Calcular métricas (cacheadas por tablero hasta la próxima escritura de tareas)
+    timings = {}
+    
+    def compute():
+        analytics, section_timings = run_board_analytics(
+            board_id,
+            db,
+            days,
+            parsed_start_date,
+            parsed_end_date
+        )
+        timings.update(section_timings)
+        return analytics
+    
+    try:
+        analytics, cache_hit = analytics_cache.get_or_compute(
+            board_id,
+            (days, start_date, end_date),
+            compute
+        )
+    except SectionTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except AnalyticsBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    
+    response.headers["X-Analytics-Cache"] = "hit" if cache_hit else "miss"
+    if timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    
+    return analytics
+
+
+@router.get("/boards/{board_id}/cfd", response_model=CumulativeFlowResponse)
+def get_cumulative_flow(
+    board_id: int,
+    response: Response,
+    from_date: Optional[str] = Query(None, alias="from", description="Primer día (YYYY-MM-DD, default: hace 29 días)"),
+    to_date: Optional[str] = Query(None, alias="to", description="Último día (YYYY-MM-DD, default: hoy)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Tareas por estado para cada día del rango (diagrama de flujo acumulado)
+    
+    Se arma con los snapshots diarios del tablero más una consulta en vivo
+    para hoy. Los días sin snapshot vienen con counts null. Máximo 366 días.
+    """
+    _get_viewable_board(board_id, db, current_user)
+    parsed_from, parsed_to = _parse_date_range(from_date, to_date)
+    
+    today = datetime.utcnow().date()
+    to_day = parsed_to.date() if parsed_to else today
+    from_day = parsed_from.date() if parsed_from else to_day - timedelta(days=29)
+    
+    if from_day > today:
+        raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser futura")
+    if from_day > to_day:
+        raise HTTPException(
+            status_code=400,
+            detail="La fecha de inicio no puede ser mayor que la fecha de fin"
+        )
+    
+    # Los días futuros no tienen datos: el rango termina hoy
+    to_day = min(to_day, today)
+    if (to_day - from_day).days >= 366:
+        raise HTTPException(status_code=400, detail="El rango máximo es de 366 días")
+    
+    cfd, cache_hit = analytics_cache.get_or_compute(
+        board_id,
+        ("cfd", from_day, to_day),
+        lambda: AnalyticsService.get_cumulative_flow(board_id, db, from_day, to_day)
     )
     
-    # Tendencias
-    daily_trends = AnalyticsService.get_daily_trends(board_id, db, min(days, 90))
-    
-    return {
-        "overview": overview,
-        "productivity": productivity,
-        "bottlenecks": bottlenecks,
-        "workload": workload,
-        "time_in_states": time_in_states,
-        "tasks_by_state": tasks_by_state,
-        "trends": {
-            "daily": daily_trends
-        }
-    }
\ No newline at end of file
+    response.headers["X-Analytics-Cache"] = "hit" if cache_hit else "miss"
+    return cfd
+
+# ============================================================================
+# JOBS EN SEGUNDO PLANO (ventanas largas)
+# ============================================================================
+
+@router.post(
+    "/boards/{board_id}/jobs",
+    response_model=AnalyticsJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def create_analytics_job(
+    board_id: int,
+    response: Response,
+    days: int = Query(30, ge=7, le=365, description="Días de historia para análisis"),
+    start_date: Optional[str] = Query(None, description="Fecha inicio (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Fecha fin (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Encolar el analytics de un tablero y devolver el job de inmediato
+    
+    Si ya existe un job vigente con los mismos parámetros se devuelve ese
+    (header X-Analytics-Job: reused). Consultar el resultado en
+    GET /analytics/jobs/{job_id}.
+    """
+    _get_viewable_board(board_id, db, current_user)
+    _parse_date_range(start_date, end_date)
+    
+    job, reused = AnalyticsJobService.submit(board_id, days, start_date, end_date, current_user, db)
+    
+    response.headers["X-Analytics-Job"] = "reused" if reused else "created"
+    response.headers["Location"] = f"/api/v1/analytics/jobs/{job.id}"
+    return job
+
+@router.get("/jobs/{job_id}", response_model=AnalyticsJobResponse)
+def get_analytics_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Estado de un job de analytics y su resultado cuando está completo"""
+    job = AnalyticsJobService.get_job(job_id, db)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    
+    _get_viewable_board(job.board_id, db, current_user)
+    
+    return job
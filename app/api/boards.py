@@ -1,18 +1,52 @@
 # app/api/boards.py
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import io
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.models.board import Board
 from app.models.board_assignment import BoardAssignment
 from app.models.task import Task
-from app.schemas.board import BoardCreate, BoardOut, BoardAssignmentCreate
-from app.schemas.task import TaskOut, TaskCreate
+from app.models.task_event import TaskEvent
+from app.schemas.board import (
+    BoardCreate,
+    BoardOut,
+    BoardSummaryOut,
+    BoardStateCount,
+    BoardAssignmentCreate,
+    BoardAssignmentsBulk,
+    BoardAssignmentsBulkResult
+)
+from app.schemas.task import TaskOut, TaskCreate, TaskImportResult
 from app.api.auth import get_current_user
 from app.models.user import User
 from app.models.workflow import WorkflowState
 from app.schemas.workflow import WorkflowStateOutLight
 from app.core.permissions import PermissionChecker
+from app.core.pagination import MAX_PAGE_SIZE, MAX_RECORD_PREVIEW, paginate_keyset, set_page_headers, validate_sort
+from app.core.conditional import compute_etag, etag_matches, not_modified, set_etag_headers
+from app.core.fieldsets import fieldset_options, parse_fields, sparse_response, sparse_schema
+from app.core.custom_field_filters import custom_field_conditions, parse_custom_field_filters
+from app.core.loaders import (
+    board_out_options,
+    board_summary_options,
+    get_board_out,
+    get_task_out,
+    task_out_options
+)
+from app.services.analytics_cache import analytics_cache
+from app.services.analytics_service import AnalyticsService
+from app.services.board_membership import BoardMembershipService
+from app.services.task_export import EXPORT_FORMATS, stream_board_tasks
+from app.services.state_transitions import record_state_transition
+from app.services.task_events import creation_event_values, load_recent_events
+from app.services.task_import import detect_format, import_tasks, workflow_fields_config
+from app.services.task_search import refresh_search_documents
+from app.services.custom_field_index import sync_custom_field_index
+from app.services.task_deletion import delete_task_dependents
+from app.api.task_fields import load_task_config
 from datetime import datetime
 
 
@@ -25,11 +59,56 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/", response_model=List[BoardOut])
+@router.get("/", response_model=List[BoardSummaryOut])
 def list_boards(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Listar tableros accesibles para el usuario según su rol"""
-    boards = PermissionChecker.get_user_boards(current_user, db)
-    return boards
+    """
+    Listar tableros accesibles para el usuario según su rol
+    
+    Devuelve cada tablero sin sus tareas, con la cantidad de tareas por
+    estado. Las tareas completas se obtienen con /boards/{id}/tasks.
+    """
+    # Tableros accesibles (mismas reglas que get_user_boards) con dueño,
+    # plantilla y asignaciones cargados en la misma consulta
+    boards = db.query(Board).filter(
+        Board.id.in_(PermissionChecker.user_board_ids_select(current_user))
+    ).options(*board_summary_options()).order_by(Board.id).all()
+    if not boards:
+        return []
+    
+    board_ids = [b.id for b in boards]
+    
+    # Conteos por (tablero, estado) en una sola consulta agregada
+    counts = db.query(
+        Task.board_id,
+        Task.state_id,
+        func.count(Task.id)
+    ).filter(
+        Task.board_id.in_(board_ids)
+    ).group_by(Task.board_id, Task.state_id).all()
+    
+    counts_by_board = {}
+    for board_id, state_id, count in counts:
+        counts_by_board.setdefault(board_id, {})[state_id] = count
+    
+    states_by_template = AnalyticsService._get_states_by_template(list({b.template_id for b in boards}), db)
+    
+    summaries = []
+    for board in boards:
+        board_counts = counts_by_board.get(board.id, {})
+        summary = BoardSummaryOut.model_validate(board)
+        summary.tasks_count = sum(board_counts.values())
+        summary.tasks_by_state = [
+            BoardStateCount(
+                state_id=state.id,
+                state_name=state.name,
+                state_order=state.order,
+                tasks_count=board_counts.get(state.id, 0)
+            )
+            for state in states_by_template.get(board.template_id, [])
+        ]
+        summaries.append(summary)
+    
+    return summaries
 
 # Fragmento relevante de app/api/boards.py
 
@@ -61,8 +140,7 @@ def create_board(
         owner_id=current_user.id
     )
     db.add(board)
-    db.commit()
-    db.refresh(board)
+    db.flush()
     
     print(f"✅ Tablero '{board.name}' creado con ID {board.id}")
     
@@ -70,31 +148,20 @@ def create_board(
     if data.assigned_user_ids and len(data.assigned_user_ids) > 0:
         print(f"📋 Asignando {len(data.assigned_user_ids)} usuarios al tablero...")
         
-        for user_id in data.assigned_user_ids:
-            # Verificar que el usuario existe
-            user_exists = db.query(User).filter(User.id == user_id).first()
-            if not user_exists:
-                print(f"⚠️ Usuario con ID {user_id} no encontrado, saltando...")
-                continue
-            
-            # Verificar que no sea el owner (no tiene sentido asignarlo)
-            if user_id == current_user.id:
-                print(f"⚠️ Saltando owner {user_id} (ya es propietario)")
-                continue
-            
-            # Crear la asignación
-            assignment = BoardAssignment(
-                board_id=board.id,
-                user_id=user_id
-            )
-            db.add(assignment)
-            print(f"  ✅ Usuario {user_id} asignado")
+        # Validar todos los ids con una sola consulta
+        existing_ids, missing_ids = BoardMembershipService.split_existing_users(data.assigned_user_ids, db)
+        if missing_ids:
+            print(f"⚠️ Usuarios no encontrados, saltando: {missing_ids}")
         
-        db.commit()
-        db.refresh(board)
-        print(f"✅ Asignaciones completadas para tablero {board.id}")
+        # El owner no se asigna (ya es propietario)
+        existing_ids.discard(current_user.id)
+        
+        added = BoardMembershipService.add_members(board.id, existing_ids, db)
+        print(f"✅ {added} usuarios asignados al tablero {board.id}")
     
-    return board
+    db.commit()
+    
+    return get_board_out(db, board.id)
 
 @router.get("/{board_id}", response_model=BoardOut)
 def get_board(
@@ -103,7 +170,7 @@ def get_board(
     current_user: User = Depends(get_current_user)
 ):
     """Obtener un tablero específico"""
-    board = db.query(Board).filter(Board.id == board_id).first()
+    board = db.query(Board).options(*board_out_options()).filter(Board.id == board_id).first()
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
     
@@ -141,8 +208,9 @@ def update_board(
         board.color = data.color
     
     db.commit()
-    db.refresh(board)
-    return board
+    # Cambiar la plantilla cambia los estados sobre los que se calculan métricas
+    analytics_cache.invalidate_board(board.id)
+    return get_board_out(db, board.id)
 
 @router.delete("/{board_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_board(
@@ -162,14 +230,37 @@ def delete_board(
             detail="Solo el administrador o el propietario pueden eliminar este tablero"
         )
     
+    delete_task_dependents(db, select(Task.id).where(Task.board_id == board_id))
     db.delete(board)
     db.commit()
+    analytics_cache.invalidate_board(board_id)
     return
 
 # ============================================================================
 # ENDPOINTS DE ASIGNACIÓN DE USUARIOS A TABLEROS
 # ============================================================================
 
+def _can_manage_assignments(board: Board, current_user: User, db: Session) -> bool:
+    """
+    Si el usuario puede asignar o remover usuarios del tablero
+    
+    - Administrador: en TODOS los tableros
+    - Manager: solo en tableros donde es OWNER
+    - Supervisor: solo en tableros donde está ASIGNADO
+    """
+    role_name = current_user.role.name if current_user.role else None
+    
+    if PermissionChecker.is_admin(current_user):
+        return True
+    if role_name == "Manager":
+        return board.owner_id == current_user.id
+    if role_name == "Supervisor":
+        return db.query(BoardAssignment).filter(
+            BoardAssignment.board_id == board.id,
+            BoardAssignment.user_id == current_user.id
+        ).first() is not None
+    return False
+
 @router.post("/{board_id}/assign", status_code=status.HTTP_201_CREATED)
 def assign_user_to_board(
     board_id: int,
@@ -189,58 +280,20 @@ def assign_user_to_board(
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
     
-    role_name = current_user.role.name if current_user.role else None
-    
-    # ✅ CORRECCIÓN: Validación según matriz de permisos
-    can_assign = False
-    
-    # Admin puede asignar en TODOS los tableros
-    if PermissionChecker.is_admin(current_user):
-        can_assign = True
-        print(f"✅ Admin {current_user.username} asignando usuario al tablero {board_id}")
-    
-    # Manager SOLO si es owner del tablero
-    elif role_name == "Manager":
-        if board.owner_id == current_user.id:
-            can_assign = True
-            print(f"✅ Manager {current_user.username} (owner) asignando usuario a su tablero {board_id}")
-        else:
-            print(f"❌ Manager {current_user.username} NO es owner del tablero {board_id}")
-    
-    # Supervisor SOLO si está asignado al tablero
-    elif role_name == "Supervisor":
-        is_assigned = db.query(BoardAssignment).filter(
-            BoardAssignment.board_id == board_id,
-            BoardAssignment.user_id == current_user.id
-        ).first()
-        
-        if is_assigned:
-            can_assign = True
-            print(f"✅ Supervisor {current_user.username} (asignado) asignando usuario al tablero {board_id}")
-        else:
-            print(f"❌ Supervisor {current_user.username} NO está asignado al tablero {board_id}")
-    
-    if not can_assign:
+    if not _can_manage_assignments(board, current_user, db):
+        role_name = current_user.role.name if current_user.role else None
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"No tienes permisos para asignar usuarios a este tablero. Tu rol: {role_name}"
         )
     
-    # Verificar si ya está asignado
-    existing = db.query(BoardAssignment).filter(
-        BoardAssignment.board_id == board_id,
-        BoardAssignment.user_id == assignment.user_id
-    ).first()
+    _, missing = BoardMembershipService.split_existing_users([assignment.user_id], db)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Usuario no encontrado: {assignment.user_id}")
     
-    if existing:
+    # INSERT ... ON CONFLICT DO NOTHING: dos asignaciones simultáneas no chocan
+    if not BoardMembershipService.add_members(board_id, [assignment.user_id], db):
         raise HTTPException(status_code=400, detail="Usuario ya asignado a este tablero")
-    
-    # Crear asignación
-    new_assignment = BoardAssignment(
-        board_id=board_id,
-        user_id=assignment.user_id
-    )
-    db.add(new_assignment)
     db.commit()
     
     return {"message": "Usuario asignado exitosamente"}
@@ -267,21 +320,7 @@ def remove_user_from_board(
     role_name = current_user.role.name if current_user.role else None
     
     # ✅ Misma lógica que assign
-    can_remove = False
-    
-    if PermissionChecker.is_admin(current_user):
-        can_remove = True
-    elif role_name == "Manager" and board.owner_id == current_user.id:
-        can_remove = True
-    elif role_name == "Supervisor":
-        is_assigned = db.query(BoardAssignment).filter(
-            BoardAssignment.board_id == board_id,
-            BoardAssignment.user_id == current_user.id
-        ).first()
-        if is_assigned:
-            can_remove = True
-    
-    if not can_remove:
+    if not _can_manage_assignments(board, current_user, db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"No tienes permisos para remover usuarios de este tablero. Tu rol: {role_name}"
@@ -299,6 +338,62 @@ def remove_user_from_board(
     db.commit()
     return
 
+@router.post("/{board_id}/assignments:bulk", response_model=BoardAssignmentsBulkResult)
+def bulk_update_assignments(
+    board_id: int,
+    data: BoardAssignmentsBulk,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Asignar y remover varios usuarios de un tablero en una sola operación
+    
+    - **add**: IDs de usuarios a asignar (los ya asignados se ignoran)
+    - **remove**: IDs de usuarios a remover
+    
+    Mismos permisos que la asignación individual. Todos los IDs de **add**
+    deben existir; si alguno no existe no se aplica ningún cambio.
+    """
+    board = db.query(Board).filter(Board.id == board_id).first()
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    
+    if not _can_manage_assignments(board, current_user, db):
+        role_name = current_user.role.name if current_user.role else None
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"No tienes permisos para asignar usuarios a este tablero. Tu rol: {role_name}"
+        )
+    
+    to_add = set(data.add)
+    to_remove = set(data.remove)
+    
+    overlap = to_add & to_remove
+    if overlap:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Usuarios en add y remove a la vez: {sorted(overlap)}"
+        )
+    
+    _, missing_ids = BoardMembershipService.split_existing_users(to_add, db)
+    if missing_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Usuarios no encontrados: {missing_ids}"
+        )
+    
+    added = BoardMembershipService.add_members(board_id, to_add, db)
+    removed = BoardMembershipService.remove_members(board_id, to_remove, db)
+    db.commit()
+    
+    print(f"✅ Tablero {board_id}: {added} usuarios asignados, {removed} removidos por {current_user.username}")
+    
+    return {
+        "added": added,
+        "already_assigned": len(to_add) - added,
+        "removed": removed
+    }
+
 # ============================================================================
 # ENDPOINTS DE TAREAS
 # ============================================================================
@@ -306,8 +401,17 @@ def remove_user_from_board(
 @router.get("/{board_id}/tasks", response_model=List[TaskOut])
 def get_board_tasks(
     board_id: int,
+    request: Request,
+    response: Response,
     start_date: str = Query(None, description="Fecha inicio (YYYY-MM-DD)"),
     end_date: str = Query(None, description="Fecha fin (YYYY-MM-DD)"),
+    limit: int = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Tareas por página (sin límite si se omite)"),
+    cursor: str = Query(None, description="Cursor de la página siguiente (header X-Next-Cursor)"),
+    sort: str = Query("created_at", description="created_at, -created_at, updated_at o -updated_at"),
+    include_total: bool = Query(False, description="Devolver el total en el header X-Total-Count"),
+    fields: str = Query(None, description="Campos de TaskOut a devolver, separados por coma (ej: id,title,state_id)"),
+    record_preview: int = Query(None, ge=0, le=MAX_RECORD_PREVIEW, description="Incluir solo las últimas N entradas del historial"),
+    if_none_match: str = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -317,7 +421,22 @@ def get_board_tasks(
     - **board_id**: ID del tablero
     - **start_date**: Filtrar tareas creadas desde esta fecha (opcional)
     - **end_date**: Filtrar tareas creadas hasta esta fecha (opcional)
+    - **limit** / **cursor**: Paginación por keyset sobre (sort, id)
+    - **include_total**: Calcular el total de tareas que cumplen los filtros
+    - **fields**: Subconjunto de campos; los demás no se consultan
+    - **record_preview**: Solo las últimas N entradas del historial
+    - **cf.<campo>**: Filtrar por campo personalizado (ej: cf.prioridad=Alta,
+      cf.etiquetas=api,backend); varios valores de un campo se combinan
+      con OR y campos distintos con AND
+    
+    Devuelve un ETag calculado con una consulta agregada (cantidad y
+    última actualización de las tareas visibles); si coincide con
+    If-None-Match responde 304 sin cargar las tareas.
     """
+    validate_sort(sort)
+    field_set = parse_fields(fields, TaskOut)
+    cf_filters = parse_custom_field_filters(request.query_params)
+    preview = record_preview is not None and (not field_set or "record" in field_set)
     
     # Verificar que el tablero existe
     board = db.query(Board).filter(Board.id == board_id).first()
@@ -364,42 +483,118 @@ def get_board_tasks(
     print(f"🔍 GET TASKS - Board ID: {board_id}")
     print(f"🔍 GET TASKS - Filtros: start={start_date}, end={end_date}")
     
-    # Query base
-    query = db.query(Task).filter(Task.board_id == board_id)
+    # Filtros base
+    filters = [Task.board_id == board_id]
     
     # Aplicar filtros de fecha
     if parsed_start_date:
-        query = query.filter(Task.created_at >= parsed_start_date)
+        filters.append(Task.created_at >= parsed_start_date)
     if parsed_end_date:
-        query = query.filter(Task.created_at <= parsed_end_date)
+        filters.append(Task.created_at <= parsed_end_date)
+    
+    # Filtros por campos personalizados (con índice, sin leer el JSON de cada tarea)
+    filters.extend(custom_field_conditions(db, cf_filters, board_id))
+    
+    # ✅ Agente: SOLO ve tareas asignadas a él
+    if role_name == "Agente":
+        filters.append(Task.assigned_to_id == current_user.id)
+    
+    # Validador de la respuesta: una sola consulta agregada sobre las tareas visibles
+    tasks_count, last_updated = db.query(
+        func.count(Task.id),
+        func.max(Task.updated_at)
+    ).filter(*filters).one()
+    etag = compute_etag(
+        board.id, board.updated_at, role_name,
+        current_user.id if role_name == "Agente" else "",
+        tasks_count, last_updated, request.url.query
+    )
+    
+    if etag_matches(if_none_match, etag):
+        print(f"✅ Sin cambios (304)")
+        print(f"{'='*80}\n")
+        return not_modified(etag)
+    set_etag_headers(response, etag)
+    
+    # Query base (con record_preview el historial se carga aparte)
+    if field_set:
+        load_fields = tuple(f for f in field_set if not (preview and f == "record"))
+        options = fieldset_options(Task, load_fields, extra_columns=[sort.lstrip("-")])
+    else:
+        options = task_out_options(include_events=not preview)
+    query = db.query(Task).options(*options).filter(*filters)
     
     # Administrador, Manager, Supervisor: ven todas las tareas del tablero
     if role_name in ["Administrador", "Manager", "Supervisor"]:
-        tasks = query.all()
+        tasks, next_cursor, total = paginate_keyset(query, Task, sort, limit, cursor, include_total)
         print(f"✅ {role_name}: ve {len(tasks)} tareas del tablero")
-        print(f"{'='*80}\n")
-        return tasks
     
     # ✅ Agente: SOLO ve tareas asignadas a él
     elif role_name == "Agente":
-        tasks = query.filter(Task.assigned_to_id == current_user.id).all()
+        tasks, next_cursor, total = paginate_keyset(query, Task, sort, limit, cursor, include_total)
         print(f"✅ Agente: ve solo {len(tasks)} tareas asignadas a él")
-        for task in tasks:
-            print(f"   - Tarea #{task.id}: {task.title} (assigned_to_id={task.assigned_to_id})")
-        print(f"{'='*80}\n")
-        return tasks
     
     # Visualizador: ve todas las tareas (solo lectura)
     elif role_name == "Visualizador":
-        tasks = query.all()
+        tasks, next_cursor, total = paginate_keyset(query, Task, sort, limit, cursor, include_total)
         print(f"✅ Visualizador: ve todas las {len(tasks)} tareas (solo lectura)")
-        print(f"{'='*80}\n")
-        return tasks
     
     # Por defecto, no mostrar tareas
-    print(f"⚠️ Usuario sin rol válido: no ve tareas")
+    else:
+        tasks, next_cursor, total = [], None, 0 if include_total else None
+        print(f"⚠️ Usuario sin rol válido: no ve tareas")
+    
     print(f"{'='*80}\n")
-    return []
+    if preview:
+        load_recent_events(db, tasks, record_preview)
+    
+    set_page_headers(response, next_cursor, total)
+    if field_set:
+        return sparse_response(tasks, sparse_schema(TaskOut, field_set), dict(response.headers))
+    return tasks
+
+@router.get("/{board_id}/tasks/export")
+def export_board_tasks(
+    board_id: int,
+    file_format: str = Query("ndjson", alias="format", description="ndjson o csv"),
+    include_record: bool = Query(False, description="Incluir el historial (record) de cada tarea"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Exportar todas las tareas de un tablero como NDJSON o CSV
+    
+    La respuesta se genera por partes mientras se leen las tareas, así
+    que se puede exportar un tablero de cualquier tamaño. Mismos permisos
+    que GET /boards/{id}/tasks (un Agente exporta solo sus tareas).
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato inválido (use uno de: {', '.join(EXPORT_FORMATS)})"
+        )
+    
+    board = db.query(Board).filter(Board.id == board_id).first()
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    
+    if not PermissionChecker.can_view_board(current_user, board, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para ver este tablero"
+        )
+    
+    role_name = current_user.role.name if current_user.role else None
+    assigned_to_id = current_user.id if role_name == "Agente" else None
+    
+    print(f"📤 Usuario {current_user.username} ({role_name}) exportando tablero {board_id} ({file_format})")
+    
+    filename = f"board-{board_id}-tasks.{file_format}"
+    return StreamingResponse(
+        stream_board_tasks(board.id, board.template_id, file_format, assigned_to_id, include_record),
+        media_type=EXPORT_FORMATS[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.post("/{board_id}/tasks", response_model=TaskOut)
 def create_task_for_board(
@@ -450,16 +645,6 @@ def create_task_for_board(
                 detail=f"El usuario con ID {task.assigned_to_id} no existe"
             )
     
-    # ✅ NUEVO: Crear registro inicial
-    now = datetime.now()
-    initial_record = [{
-        "fecha": now.strftime("%d/%m/%Y"),
-        "hora": now.strftime("%H:%M:%S"),
-        "user": current_user.username,
-        "status": state.name,
-        "doc": f"Tarea creada por {current_user.username}"
-    }]
-    
     # Crear la tarea
     db_task = Task(
         title=task.title,
@@ -470,18 +655,90 @@ def create_task_for_board(
         created_by_id=current_user.id,
         start_date=task.start_date,
         end_date=task.end_date,
-        custom_fields=task.custom_fields or {},
-        record=initial_record  # ✅ NUEVO: Inicializar con registro de creación
+        custom_fields=task.custom_fields or {}
     )
     
     db.add(db_task)
+    db.flush()
+    # ✅ NUEVO: Inicializar el historial con el registro de creación
+    db.add(TaskEvent(**creation_event_values(db_task.id, current_user, state.name)))
+    
+    # Igual que la importación: si no entra en el estado inicial, registrar la llegada a su estado
+    initial_state_id = db.query(WorkflowState.id).filter(
+        WorkflowState.workflow_id == board.template_id
+    ).order_by(WorkflowState.order).limit(1).scalar()
+    if state.id != initial_state_id:
+        transition = record_state_transition(db, db_task, initial_state_id, state.id, current_user)
+        transition.at = db_task.created_at
+    
+    refresh_search_documents(db, [db_task.id])
+    sync_custom_field_index(db, [db_task.id])
     db.commit()
-    db.refresh(db_task)
+    analytics_cache.invalidate_board(board_id)
+    db_task = get_task_out(db, db_task.id)
     
     print(f"✅ Tarea '{db_task.title}' creada con ID {db_task.id}, assigned_to_id={db_task.assigned_to_id}")
     
     return db_task
 
+@router.post("/{board_id}/tasks:import", response_model=TaskImportResult)
+def import_tasks_for_board(
+    board_id: int,
+    file: UploadFile = File(..., description="Archivo JSON Lines (.jsonl) o CSV (.csv)"),
+    file_format: str | None = Query(None, alias="format", description="jsonl o csv (default: según la extensión)"),
+    dry_run: bool = Query(False, description="Solo validar, sin crear tareas"),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Filas por inserción"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Importar tareas masivamente a un tablero (mismos permisos que crear tarea)
+    
+    Cada fila tiene title y opcionalmente description, state (nombre) o
+    state_id, assignee (username) o assigned_to_id, start_date, end_date,
+    created_at (ISO 8601) y custom_fields. Las filas inválidas se reportan
+    con su número de línea y no detienen la importación.
+    """
+    board = db.query(Board).filter(Board.id == board_id).first()
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    
+    if not PermissionChecker.can_view_board(current_user, board, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para acceder a este tablero"
+        )
+    
+    role_name = current_user.role.name if current_user.role else None
+    
+    if role_name not in ["Administrador", "Manager", "Supervisor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Solo Administrador, Manager y Supervisor pueden crear tareas. Tu rol: {role_name}"
+        )
+    
+    try:
+        file_format = detect_format(file.filename, file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    fields_config = workflow_fields_config(board, db, load_task_config())
+    
+    print(f"📥 Usuario {current_user.username} importando tareas ({file_format}) en tablero {board_id}")
+    
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        result = import_tasks(db, board, current_user, stream, file_format, fields_config, batch_size, dry_run)
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="El archivo debe estar codificado en UTF-8")
+    finally:
+        stream.detach()
+    
+    print(f"✅ Importación en tablero {board_id}: {result['created']} creadas, {result['failed']} con errores")
+    
+    return result
+
 @router.get("/{board_id}/states", response_model=List[WorkflowStateOutLight])
 def get_board_states(
     board_id: int, 
@@ -496,5 +753,5 @@ def get_board_states(
     states = db.query(WorkflowState).filter(
         WorkflowState.workflow_id == board.template_id
     ).order_by(WorkflowState.order).all()
-
+    
     return states
\ No newline at end of file
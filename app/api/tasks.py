@@ -1,15 +1,27 @@
 # app/api/tasks.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, attributes
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Dict, Any
-from datetime import datetime
 from app.core.database import SessionLocal
 from app.models.task import Task
 from app.models.board import Board
-from app.schemas.task import TaskCreate, TaskUpdate, TaskOut, TaskRecordAdd
+from app.schemas.task import TaskCreate, TaskUpdate, TaskOut, TaskRecordAdd, TaskBatchUpdate, TaskBatchResult, TaskSearchResult
 from app.api.auth import get_current_user
 from app.models.user import User
+from app.models.workflow import WorkflowState
 from app.core.permissions import PermissionChecker
+from app.core.pagination import MAX_PAGE_SIZE, MAX_RECORD_PREVIEW, paginate_keyset, set_page_headers, validate_sort
+from app.core.loaders import get_task_out, get_tasks_out, task_out_options
+from app.core.fieldsets import fieldset_options, parse_fields, sparse_response, sparse_schema
+from app.core.custom_field_filters import custom_field_conditions, parse_custom_field_filters
+from app.services.analytics_cache import analytics_cache
+from app.services.state_transitions import record_state_transition
+from app.services.task_events import add_task_event, event_values, load_recent_events
+from app.services.task_search import refresh_search_documents, search_tasks as run_task_search
+from app.services.custom_field_index import sync_custom_field_index
+from app.services.task_deletion import delete_task_dependents
+from app.models.task_event import TaskEvent
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -20,56 +32,54 @@ def get_db():
     finally:
         db.close()
 
-def add_record_entry(task: Task, user: User, state_name: str, doc: str):
-    """
-    Agregar una entrada al historial de la tarea
-    
-    Args:
-        task: Tarea a la que agregar el registro
-        user: Usuario que realiza la acción
-        state_name: Nombre del estado actual de la tarea
-        doc: Comentario/documentación
-    """
-    now = datetime.now()
-    
-    new_entry = {
-        "fecha": now.strftime("%d/%m/%Y"),
-        "hora": now.strftime("%H:%M:%S"),
-        "user": user.username,
-        "status": state_name,
-        "doc": doc
-    }
-    
-    # Asegurar que record sea una lista mutable
-    if task.record is None:
-        task.record = []
-    elif not isinstance(task.record, list):
-        task.record = []
-    
-    # Crear una nueva lista para que SQLAlchemy detecte el cambio
-    current_record = list(task.record) if task.record else []
-    current_record.append(new_entry)
-    task.record = current_record
-    
-    # Marcar explícitamente el campo como modificado
-    attributes.flag_modified(task, "record")
-
 @router.get("", response_model=List[TaskOut])
 def list_tasks(
+    request: Request,
+    response: Response,
     board_id: int | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Tareas por página (sin límite si se omite)"),
+    cursor: str | None = Query(None, description="Cursor de la página siguiente (header X-Next-Cursor)"),
+    sort: str = Query("created_at", description="created_at, -created_at, updated_at o -updated_at"),
+    include_total: bool = Query(False, description="Devolver el total en el header X-Total-Count"),
+    fields: str | None = Query(None, description="Campos de TaskOut a devolver, separados por coma (ej: id,title,state_id)"),
+    record_preview: int | None = Query(None, ge=0, le=MAX_RECORD_PREVIEW, description="Incluir solo las últimas N entradas del historial"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Listar tareas accesibles para el usuario según su rol"""
+    """
+    Listar tareas accesibles para el usuario según su rol
+    
+    Con **limit** se pagina por keyset sobre (sort, id); el cursor de la
+    página siguiente se devuelve en el header X-Next-Cursor. Con
+    **fields** solo se consultan y devuelven los campos indicados. Con
+    **record_preview** el historial trae solo las últimas N entradas.
+    
+    Filtros por campo personalizado: **cf.<campo>=valor** (ej:
+    cf.prioridad=Alta, cf.etiquetas=api,backend). Varios valores de un
+    campo se combinan con OR y campos distintos con AND.
+    """
+    validate_sort(sort)
+    field_set = parse_fields(fields, TaskOut)
+    cf_filters = parse_custom_field_filters(request.query_params)
+    preview = record_preview is not None and (not field_set or "record" in field_set)
+    
     # Obtener tableros accesibles
     accessible_boards = PermissionChecker.get_user_boards(current_user, db)
     accessible_board_ids = [b.id for b in accessible_boards]
     
     # Consulta base: tareas en tableros accesibles
-    q = db.query(Task).filter(Task.board_id.in_(accessible_board_ids))
+    # Con record_preview el historial se carga aparte (solo las últimas N entradas)
+    if field_set:
+        load_fields = tuple(f for f in field_set if not (preview and f == "record"))
+        options = fieldset_options(Task, load_fields, extra_columns=[sort.lstrip("-")])
+    else:
+        options = task_out_options(include_events=not preview)
+    q = db.query(Task).options(*options).filter(Task.board_id.in_(accessible_board_ids))
     
     if board_id:
         q = q.filter(Task.board_id == board_id)
+    if cf_filters:
+        q = q.filter(*custom_field_conditions(db, cf_filters, board_id))
     
     role_name = current_user.role.name if current_user.role else None
     
@@ -79,22 +89,72 @@ def list_tasks(
     # Agente: SOLO tareas asignadas a él
     if role_name == "Agente":
         q = q.filter(Task.assigned_to_id == current_user.id)
-        tasks = q.all()
+        tasks, next_cursor, total = paginate_keyset(q, Task, sort, limit, cursor, include_total)
         print(f"✅ Agente: filtrando solo {len(tasks)} tareas asignadas")
         print(f"{'='*80}\n")
     
     # Administrador, Manager, Supervisor, Visualizador: todas las tareas
     elif role_name in ["Administrador", "Manager", "Supervisor", "Visualizador"]:
-        tasks = q.all()
+        tasks, next_cursor, total = paginate_keyset(q, Task, sort, limit, cursor, include_total)
         print(f"✅ {role_name}: ve {len(tasks)} tareas")
         print(f"{'='*80}\n")
     else:
-        tasks = []
+        tasks, next_cursor, total = [], None, 0 if include_total else None
         print(f"⚠️ Sin rol válido")
         print(f"{'='*80}\n")
     
+    if preview:
+        load_recent_events(db, tasks, record_preview)
+    
+    set_page_headers(response, next_cursor, total)
+    if field_set:
+        return sparse_response(tasks, sparse_schema(TaskOut, field_set), dict(response.headers))
     return [TaskOut.model_validate(t) for t in tasks]
 
+@router.get("/search", response_model=List[TaskSearchResult])
+def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar en título, descripción e historial"),
+    board_id: int | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="Resultados por página"),
+    offset: int = Query(0, ge=0, description="Resultados a saltar (header X-Next-Cursor)"),
+    include_total: bool = Query(False, description="Devolver el total en el header X-Total-Count"),
+    record_preview: int | None = Query(None, ge=0, le=MAX_RECORD_PREVIEW, description="Incluir solo las últimas N entradas del historial"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Buscar tareas por texto, ordenadas por relevancia
+    
+    Busca en título, descripción y comentarios del historial con el
+    índice de texto de la base (tsvector + GIN en Postgres, FTS5 en
+    SQLite). Los permisos son los de GET /tasks y se aplican en la misma
+    consulta. Si hay más resultados, el header X-Next-Cursor trae el
+    **offset** de la página siguiente.
+    """
+    hits, has_more, total = run_task_search(
+        db, current_user, q, board_id=board_id, limit=limit, offset=offset, include_total=include_total
+    )
+    
+    print(f"🔎 SEARCH '{q}' - {current_user.username}: {len(hits)} resultados")
+    
+    preview = record_preview is not None
+    tasks = {
+        t.id: t for t in db.query(Task).options(*task_out_options(include_events=not preview)).filter(
+            Task.id.in_([task_id for task_id, _ in hits])
+        )
+    } if hits else {}
+    if preview:
+        load_recent_events(db, list(tasks.values()), record_preview)
+    
+    set_page_headers(response, str(offset + limit) if has_more else None, total)
+    # Una tarea borrada entre las dos consultas simplemente no aparece
+    return [
+        TaskSearchResult.model_validate(tasks[task_id]).model_copy(update={"rank": rank})
+        for task_id, rank in hits
+        if task_id in tasks
+    ]
+
 @router.put("/{task_id}", response_model=TaskOut)
 def update_task(
     task_id: int,
@@ -103,7 +163,8 @@ def update_task(
     current_user: User = Depends(get_current_user)
 ):
     """Actualizar una tarea según permisos del usuario"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    # Solo el estado actual; la respuesta se carga completa después del commit
+    task = db.query(Task).options(joinedload(Task.state)).filter(Task.id == task_id).first()
     
     if not task:
         raise HTTPException(status_code=404, detail="Tarea no encontrada")
@@ -123,6 +184,9 @@ def update_task(
     
     # Detectar cambios para agregar al historial
     state_changed = False
+    text_changed = False
+    custom_fields_changed = False
+    old_state_id = task.state_id
     old_state_name = task.state.name if task.state else "Sin estado"
     new_state_name = old_state_name
     
@@ -135,6 +199,11 @@ def update_task(
                 new_state = db.query(WorkflowState).filter(WorkflowState.id == value).first()
                 new_state_name = new_state.name if new_state else "Sin estado"
             
+            if field in ("title", "description") and value != getattr(task, field):
+                text_changed = True
+            if field == "custom_fields":
+                custom_fields_changed = True
+            
             setattr(task, field, value)
         elif field not in editable_fields and value is not None:
             # Si intenta editar un campo no permitido
@@ -146,13 +215,142 @@ def update_task(
     # Agregar entrada al historial si cambió el estado
     if state_changed:
         doc = f"Cambió el estado de '{old_state_name}' a '{new_state_name}'"
-        add_record_entry(task, current_user, new_state_name, doc)
+        add_task_event(db, task, current_user, new_state_name, doc)
+        record_state_transition(db, task, old_state_id, task.state_id, current_user)
+    
+    # El comentario ya se agregó al documento; título o descripción lo regeneran
+    if text_changed:
+        refresh_search_documents(db, [task.id])
+    if custom_fields_changed:
+        sync_custom_field_index(db, [task.id])
     
     db.commit()
-    db.refresh(task)
+    analytics_cache.invalidate_board(task.board_id)
+    task = get_task_out(db, task.id)
     
     return TaskOut.model_validate(task)
 
+@router.patch(":batch", response_model=TaskBatchResult)
+def batch_update_tasks(
+    data: TaskBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Actualizar varias tareas en una sola operación (mover o reasignar tarjetas)
+    
+    Cada elemento tiene el **id** de la tarea y los **changes** con el mismo
+    formato que PUT /tasks/{id}, y se valida con las mismas reglas de
+    permisos y campos editables. Los elementos inválidos se reportan con su
+    error sin afectar al resto; los válidos se guardan con un solo commit.
+    """
+    task_ids = {item.id for item in data.items}
+    tasks = {
+        t.id: t for t in db.query(Task).options(joinedload(Task.state)).filter(Task.id.in_(task_ids))
+    }
+    editable_ids = PermissionChecker.get_editable_task_ids(current_user, list(tasks.values()), db)
+    
+    # Estados y usuarios referenciados por todo el lote (una consulta cada uno)
+    requested = [item.changes.model_dump(exclude_unset=True) for item in data.items]
+    state_ids = {c["state_id"] for c in requested if c.get("state_id") is not None}
+    user_ids = {c["assigned_to_id"] for c in requested if c.get("assigned_to_id") is not None}
+    states = {s.id: s for s in db.query(WorkflowState).filter(WorkflowState.id.in_(state_ids))} if state_ids else {}
+    existing_user_ids = {u_id for (u_id,) in db.query(User.id).filter(User.id.in_(user_ids))} if user_ids else set()
+    board_templates = dict(
+        db.query(Board.id, Board.template_id).filter(Board.id.in_({t.board_id for t in tasks.values()}))
+    ) if tasks else {}
+    
+    print(f"\n{'='*80}")
+    print(f"📦 BATCH UPDATE - {len(data.items)} tareas por {current_user.username}")
+    
+    results = []
+    updated_ids = []
+    search_ids = []
+    custom_field_ids = []
+    events = []
+    seen = set()
+    
+    def fail(task_id: int, status_code: int, error: str):
+        results.append({"id": task_id, "status": "error", "status_code": status_code, "error": error})
+    
+    for item, update_data in zip(data.items, requested):
+        task = tasks.get(item.id)
+        
+        if item.id in seen:
+            fail(item.id, 400, "Tarea repetida en el lote")
+            continue
+        seen.add(item.id)
+        
+        if not task:
+            fail(item.id, 404, "Tarea no encontrada")
+            continue
+        
+        if task.id not in editable_ids:
+            fail(item.id, 403, "No tienes permisos para editar esta tarea")
+            continue
+        
+        editable_fields = PermissionChecker.get_editable_task_fields(current_user, task)
+        forbidden = [f for f, v in update_data.items() if f not in editable_fields and v is not None]
+        if forbidden:
+            fail(item.id, 403, f"No tienes permisos para editar el campo '{forbidden[0]}'")
+            continue
+        
+        changes = {f: v for f, v in update_data.items() if f in editable_fields}
+        
+        new_state = None
+        if "state_id" in changes and changes["state_id"] != task.state_id:
+            new_state = states.get(changes["state_id"])
+            if not new_state or new_state.workflow_id != board_templates.get(task.board_id):
+                fail(item.id, 400, "El estado no pertenece a la plantilla del tablero")
+                continue
+        
+        if changes.get("assigned_to_id") is not None and changes["assigned_to_id"] not in existing_user_ids:
+            fail(item.id, 400, f"El usuario con ID {changes['assigned_to_id']} no existe")
+            continue
+        
+        old_state_id = task.state_id
+        old_state_name = task.state.name if task.state else "Sin estado"
+        
+        for field, value in changes.items():
+            setattr(task, field, value)
+        
+        # Agregar entrada al historial si cambió el estado (se insertan todas juntas)
+        if new_state:
+            doc = f"Cambió el estado de '{old_state_name}' a '{new_state.name}'"
+            events.append(event_values(task.id, current_user, new_state.name, doc))
+            record_state_transition(db, task, old_state_id, new_state.id, current_user)
+        
+        # Documento de búsqueda: cambia con título, descripción o historial
+        if new_state or {"title", "description"} & changes.keys():
+            search_ids.append(task.id)
+        if "custom_fields" in changes:
+            custom_field_ids.append(task.id)
+        
+        updated_ids.append(task.id)
+        results.append({"id": item.id, "status": "updated", "status_code": 200})
+    
+    if updated_ids:
+        # Tomar los tableros antes del commit (después los objetos expiran)
+        touched_boards = {tasks[t_id].board_id for t_id in updated_ids}
+        if events:
+            db.execute(insert(TaskEvent), events)
+        refresh_search_documents(db, search_ids)
+        sync_custom_field_index(db, custom_field_ids)
+        db.commit()
+        for board_id in touched_boards:
+            analytics_cache.invalidate_board(board_id)
+        
+        refreshed = {t.id: t for t in get_tasks_out(db, updated_ids)}
+        for result in results:
+            if result["status"] == "updated":
+                result["task"] = TaskOut.model_validate(refreshed[result["id"]])
+    
+    failed = len(results) - len(updated_ids)
+    print(f"✅ {len(updated_ids)} tareas actualizadas, {failed} con errores")
+    print(f"{'='*80}\n")
+    
+    return {"updated": len(updated_ids), "failed": failed, "results": results}
+
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_task(
     task_id: int,
@@ -166,24 +364,31 @@ def delete_task(
         raise HTTPException(status_code=404, detail="Tarea no encontrada")
     
     role_name = current_user.role.name if current_user.role else None
+    board_id = task.board_id
     
     # Admin puede eliminar cualquier tarea
     if role_name == "Administrador":
+        delete_task_dependents(db, [task.id])
         db.delete(task)
         db.commit()
+        analytics_cache.invalidate_board(board_id)
         return
     
     # Manager y Supervisor pueden eliminar tareas en sus tableros
     if role_name in ["Manager", "Supervisor"]:
         if PermissionChecker.can_edit_task(current_user, task, db):
+            delete_task_dependents(db, [task.id])
             db.delete(task)
             db.commit()
+            analytics_cache.invalidate_board(board_id)
             return
     
     # Creador puede eliminar su propia tarea
     if task.created_by_id == current_user.id:
+        delete_task_dependents(db, [task.id])
         db.delete(task)
         db.commit()
+        analytics_cache.invalidate_board(board_id)
         return
     
     raise HTTPException(
@@ -217,7 +422,8 @@ def add_task_record(
     print(f"📝 Usuario: {current_user.username} ({current_user.role.name if current_user.role else 'Sin rol'})")
     print(f"📝 Comentario: {record_data.doc}")
     
-    task = db.query(Task).filter(Task.id == task_id).first()
+    # Solo el estado actual: agregar una entrada no lee el historial
+    task = db.query(Task).options(joinedload(Task.state)).filter(Task.id == task_id).first()
     
     if not task:
         print(f"❌ Tarea no encontrada")
@@ -237,10 +443,12 @@ def add_task_record(
     state_name = task.state.name if task.state else "Sin estado"
     
     # Agregar entrada al historial
-    add_record_entry(task, current_user, state_name, record_data.doc)
+    add_task_event(db, task, current_user, state_name, record_data.doc)
     
     db.commit()
-    db.refresh(task)
+    # El comentario actualiza updated_at, que usan las métricas de tiempo
+    analytics_cache.invalidate_board(task.board_id)
+    task = get_task_out(db, task.id)
     
     print(f"✅ Comentario agregado exitosamente")
     print(f"{'='*80}\n")
@@ -250,13 +458,24 @@ def add_task_record(
 @router.get("/{task_id}/records", response_model=List[Dict])
 def get_task_records(
     task_id: int,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Entradas por página (todas si se omite)"),
+    before: int | None = Query(None, ge=1, description="Solo entradas anteriores a este id (cursor)"),
+    after: int | None = Query(None, ge=1, description="Solo entradas posteriores a este id (cursor)"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="asc (más antiguas primero) o desc (más recientes primero)"),
+    user: str | None = Query(None, description="Filtrar por username"),
+    state: str | None = Query(None, alias="status", description="Filtrar por nombre de estado"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Obtener el historial completo de una tarea
+    Obtener el historial de una tarea, opcionalmente paginado y filtrado
     
-    Todos los roles que pueden ver la tarea pueden ver su historial
+    Todos los roles que pueden ver la tarea pueden ver su historial.
+    Cada entrada incluye su **id**, que sirve como cursor: con **limit**
+    el header X-Next-Cursor trae el id a pasar en **before** (orden desc)
+    o **after** (orden asc) para la página siguiente. Solo se lee de la
+    base la página pedida.
     """
     task = db.query(Task).filter(Task.id == task_id).first()
     
@@ -271,5 +490,28 @@ def get_task_records(
             detail="No tienes permisos para ver esta tarea"
         )
     
-    # Retornar el historial (si es None, retornar lista vacía)
-    return task.record if task.record else []
\ No newline at end of file
+    q = db.query(TaskEvent).filter(TaskEvent.task_id == task_id)
+    
+    if user:
+        q = q.filter(TaskEvent.username == user)
+    if state:
+        q = q.filter(TaskEvent.status == state)
+    if before:
+        q = q.filter(TaskEvent.id < before)
+    if after:
+        q = q.filter(TaskEvent.id > after)
+    
+    q = q.order_by(TaskEvent.id.desc() if order == "desc" else TaskEvent.id.asc())
+    
+    next_cursor = None
+    if limit is None:
+        events = q.all()
+    else:
+        # Una fila extra indica si hay página siguiente
+        events = q.limit(limit + 1).all()
+        if len(events) > limit:
+            events = events[:limit]
+            next_cursor = str(events[-1].id)
+    
+    set_page_headers(response, next_cursor, None)
+    return [{"id": event.id, **event.to_record_entry()} for event in events]
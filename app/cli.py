@@ -1,5 +1,6 @@
 # app/cli.py
 import click
+from datetime import datetime, timedelta
 from app.core.database import SessionLocal, Base, engine
 from app.models.roles import Role
 from app.models.workflow import WorkflowTemplate, WorkflowState
@@ -46,6 +47,266 @@ def reset_db():
         click.echo("✅ Base de datos reseteada\n")
 
 
+@cli.command()
+@click.option('--date', 'snapshot_date', default=None, help='Día a materializar (YYYY-MM-DD, default: ayer UTC)')
+@click.option('--days', default=1, show_default=True, help='Cantidad de días hacia atrás a materializar (backfill)')
+@click.option('--board-id', 'board_ids', multiple=True, type=int, help='Limitar a uno o más tableros')
+def snapshot(snapshot_date, days, board_ids):
+    """
+    Materializar snapshots diarios de analytics por tablero
+    
+    Los conteos por estado de días pasados se reconstruyen desde
+    task_state_transitions (ejecutar antes backfill-transitions).
+    """
+    from app.services.snapshot_service import SnapshotService
+    
+    if snapshot_date:
+        try:
+            last_day = datetime.strptime(snapshot_date, "%Y-%m-%d").date()
+        except ValueError:
+            raise click.BadParameter("Formato inválido (use YYYY-MM-DD)", param_hint="--date")
+    else:
+        last_day = datetime.utcnow().date() - timedelta(days=1)
+    
+    db = SessionLocal()
+    try:
+        for offset in range(days - 1, -1, -1):
+            day = last_day - timedelta(days=offset)
+            written = SnapshotService.materialize_day(db, day, list(board_ids) or None)
+            click.echo(f"  ✓ {day}: {written} tableros")
+        click.echo("✅ Snapshots materializados\n")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@cli.command()
+@click.option('--batch-size', default=1000, show_default=True, help='Tareas por lote')
+def backfill_events(batch_size):
+    """Copiar a task_events los historiales del JSON de Task.record"""
+    from app.services.task_events import backfill_task_events
+    
+    db = SessionLocal()
+    try:
+        click.echo("📦 Copiando historiales a task_events...")
+        inserted = backfill_task_events(db, batch_size)
+        click.echo(f"✅ {inserted} eventos insertados\n")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@cli.command()
+@click.option('--batch-size', default=500, show_default=True, help='Tareas por lote')
+def reindex_search(batch_size):
+    """Regenerar el índice de búsqueda de tareas (task_search_documents)"""
+    from app.services.task_search import reindex_all
+    
+    db = SessionLocal()
+    try:
+        click.echo("🔎 Regenerando el índice de búsqueda...")
+        written = reindex_all(db, batch_size)
+        click.echo(f"✅ {written} tareas indexadas\n")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@cli.command()
+@click.option('--batch-size', default=500, show_default=True, help='Tareas por lote')
+def reindex_custom_fields(batch_size):
+    """Regenerar el índice de campos personalizados (motores sin JSONB)"""
+    from app.services.custom_field_index import reindex_custom_fields as run_reindex, uses_jsonb
+    
+    db = SessionLocal()
+    try:
+        if uses_jsonb(db):
+            click.echo("ℹ️  Postgres filtra custom_fields con su índice GIN; no hay nada que regenerar\n")
+            return
+        click.echo("🏷️  Regenerando el índice de campos personalizados...")
+        written = run_reindex(db, batch_size)
+        click.echo(f"✅ {written} valores indexados\n")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@cli.command()
+@click.option('--batch-size', default=1000, show_default=True, help='Filas por inserción')
+def backfill_transitions(batch_size):
+    """Poblar task_state_transitions a partir del historial (task_events)"""
+    from app.services.state_transitions import backfill_state_transitions
+    
+    db = SessionLocal()
+    try:
+        click.echo("📦 Reconstruyendo cambios de estado desde el historial...")
+        inserted = backfill_state_transitions(db, batch_size)
+        click.echo(f"✅ {inserted} transiciones insertadas\n")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+
+@cli.command()
+@click.option('--boards', default=20, show_default=True, help='Cantidad de tableros')
+@click.option('--users', default=50, show_default=True, help='Cantidad de usuarios')
+@click.option('--tasks', default=100_000, show_default=True, help='Cantidad de tareas')
+@click.option('--days', default=365, show_default=True, help='Días de historia a repartir')
+@click.option('--seed', 'random_seed', default=42, show_default=True, help='Semilla (mismo valor, mismo dataset)')
+@click.option('--batch-size', default=5000, show_default=True, help='Filas por inserción')
+def generate_data(boards, users, tasks, days, random_seed, batch_size):
+    """Generar un dataset sintético determinista para benchmarks"""
+    from app.services.synthetic_data import generate_synthetic_dataset
+    
+    db = SessionLocal()
+    try:
+        click.echo(f"📦 Generando {tasks} tareas en {boards} tableros (semilla {random_seed})...")
+        started = datetime.utcnow()
+        created = generate_synthetic_dataset(db, boards, users, tasks, days, random_seed, batch_size)
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        for name, count in created.items():
+            click.echo(f"  ✓ {name}: {count}")
+        click.echo(f"✅ Dataset generado en {elapsed:.1f}s\n")
+    except ValueError as e:
+        db.rollback()
+        raise click.ClickException(str(e))
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@cli.command()
+@click.argument('board_id', type=int)
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user', 'username', default='admin', show_default=True, help='Usuario que figura como creador')
+@click.option('--format', 'file_format', type=click.Choice(['jsonl', 'csv']), default=None, help='Formato (default: según la extensión)')
+@click.option('--batch-size', default=1000, show_default=True, help='Filas por inserción')
+@click.option('--dry-run', is_flag=True, help='Solo validar, sin crear tareas')
+def import_tasks(board_id, path, username, file_format, batch_size, dry_run):
+    """Importar tareas desde un archivo JSON Lines o CSV a un tablero"""
+    from app.api.task_fields import load_task_config
+    from app.models.board import Board
+    from app.services.task_import import detect_format, import_tasks as run_import, workflow_fields_config
+    
+    db = SessionLocal()
+    try:
+        board = db.query(Board).filter(Board.id == board_id).first()
+        if not board:
+            raise click.ClickException(f"El tablero {board_id} no existe")
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise click.ClickException(f"El usuario '{username}' no existe")
+        
+        try:
+            file_format = detect_format(path, file_format)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        
+        fields_config = workflow_fields_config(board, db, load_task_config())
+        
+        click.echo(f"📥 Importando {path} ({file_format}) en tablero '{board.name}'...")
+        started = datetime.utcnow()
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            result = run_import(db, board, user, stream, file_format, fields_config, batch_size, dry_run)
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        
+        for error in result["errors"]:
+            click.echo(f"  ⚠️ línea {error['line']}: {error['error']}")
+        if result["errors_truncated"]:
+            click.echo(f"  ⚠️ ... y {result['failed'] - len(result['errors'])} errores más")
+        
+        action = "válidas" if dry_run else "creadas"
+        click.echo(
+            f"✅ {result['created']} tareas {action}, {result['failed']} con errores "
+            f"de {result['total_rows']} filas en {elapsed:.1f}s\n"
+        )
+    except click.ClickException:
+        raise
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@cli.command()
+@click.option('--repeat', default=5, show_default=True, help='Corridas por caso (más una de calentamiento)')
+@click.option('--board-id', default=None, type=int, help='Tablero a medir (default: el de más tareas)')
+@click.option('--only', multiple=True, help='Ejecutar solo los casos que contengan este texto')
+@click.option('--no-endpoints', is_flag=True, help='Medir solo los métodos de AnalyticsService')
+@click.option('--baseline', 'baseline_path', default=None, help='Archivo de baselines (default: benchmarks/baselines.json)')
+@click.option('--save-baseline', is_flag=True, help='Guardar los resultados como nuevo baseline')
+@click.option('--tolerance', default=0.2, show_default=True, help='Tolerancia relativa de latencia y memoria')
+@click.option('--fail-on-regression', is_flag=True, help='Salir con código 1 si hay regresiones')
+def benchmark(repeat, board_id, only, no_endpoints, baseline_path, save_baseline, tolerance, fail_on_regression):
+    """Medir latencia, consultas y memoria de analytics y endpoints"""
+    from app.services.benchmark import (
+        DEFAULT_BASELINE_PATH,
+        compare_with_baseline,
+        load_baselines,
+        run_benchmarks,
+        save_baselines
+    )
+    
+    baseline_path = baseline_path or DEFAULT_BASELINE_PATH
+    dialect = engine.dialect.name
+    
+    click.echo(f"⏱️  Benchmark sobre {dialect} ({repeat} corridas por caso)...")
+    try:
+        results = run_benchmarks(repeat, board_id, list(only) or None, not no_endpoints)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    baseline = load_baselines(baseline_path).get(dialect, {})
+    regressions = compare_with_baseline(results, baseline, tolerance)
+    
+    click.echo(f"\n{'caso':<32}{'ms (p50)':>10}{'min':>10}{'max':>10}{'queries':>9}{'peak KB':>11}  baseline")
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if reference:
+            delta = (metrics["latency_ms"] / reference["latency_ms"] - 1) * 100 if reference["latency_ms"] else 0
+            status = f"{delta:+.0f}% / {reference['queries']}q"
+            if name in regressions:
+                status += f"  ⚠️ {', '.join(regressions[name])}"
+        else:
+            status = "-"
+        click.echo(
+            f"{name:<32}{metrics['latency_ms']:>10.1f}{metrics['min_ms']:>10.1f}{metrics['max_ms']:>10.1f}"
+            f"{metrics['queries']:>9}{metrics['peak_kb']:>11.0f}  {status}"
+        )
+    
+    if save_baseline:
+        save_baselines(baseline_path, dialect, results)
+        click.echo(f"\n✅ Baseline guardado en {baseline_path}")
+    
+    if regressions:
+        click.echo(f"\n⚠️  {len(regressions)} casos con regresión respecto del baseline")
+        if fail_on_regression:
+            raise SystemExit(1)
+    else:
+        click.echo("\n✅ Sin regresiones")
+
+
 def seed_data():
     """Función auxiliar para poblar datos"""
     db = SessionLocal()
@@ -0,0 +1,86 @@
+# app/core/custom_field_filters.py
+import math
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import or_, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.task_custom_field_value import TaskCustomFieldValue
+from app.services.custom_field_index import uses_jsonb
+
+# Prefijo de los filtros por campo personalizado: ?cf.prioridad=Alta&cf.etiquetas=api,backend
+CUSTOM_FIELD_PREFIX = "cf."
+
+
+def parse_custom_field_filters(query_params) -> Dict[str, List[str]]:
+    """
+    Filtros cf.<campo>=v1,v2 de la query string
+    
+    Varios valores (separados por coma o repitiendo el parámetro) se
+    combinan con OR; campos distintos, con AND. Devuelve {} si no hay
+    filtros.
+    """
+    filters: Dict[str, List[str]] = {}
+    
+    for name, raw in query_params.multi_items():
+        if not name.startswith(CUSTOM_FIELD_PREFIX):
+            continue
+        key = name[len(CUSTOM_FIELD_PREFIX):]
+        values = [v.strip() for v in raw.split(",") if v.strip()]
+        if not key or not values:
+            raise HTTPException(status_code=400, detail=f"Filtro de campo personalizado inválido: '{name}'")
+        filters.setdefault(key, []).extend(values)
+    
+    return filters
+
+
+def _json_candidates(value: str) -> List[Any]:
+    """Valores JSON equivalentes a un valor de la query string ("5" también es 5)"""
+    candidates: List[Any] = [value]
+    if value in ("true", "false"):
+        candidates.append(value == "true")
+        return candidates
+    try:
+        candidates.append(int(value))
+    except ValueError:
+        try:
+            number = float(value)
+            if math.isfinite(number):
+                candidates.append(number)
+        except ValueError:
+            pass
+    return candidates
+
+
+def custom_field_conditions(db: Session, filters: Dict[str, List[str]], board_id: Optional[int] = None) -> list:
+    """
+    Condiciones SQL sobre Task para los filtros cf.<campo>
+    
+    - Postgres: contención (@>) sobre custom_fields JSONB, que usa el
+      índice GIN; cada valor se busca como escalar (select) y dentro de
+      una lista (multiselect)
+    - Otros motores: subconsulta sobre task_custom_field_values con el
+      índice (key, value, board_id)
+    """
+    conditions = []
+    
+    for key, values in filters.items():
+        if uses_jsonb(db):
+            custom_fields = type_coerce(Task.custom_fields, JSONB)
+            conditions.append(or_(*[
+                custom_fields.contains({key: document})
+                for value in values
+                for candidate in _json_candidates(value)
+                for document in (candidate, [candidate])
+            ]))
+        else:
+            matching = select(TaskCustomFieldValue.task_id).where(
+                TaskCustomFieldValue.key == key,
+                TaskCustomFieldValue.value.in_(values)
+            )
+            if board_id is not None:
+                matching = matching.where(TaskCustomFieldValue.board_id == board_id)
+            conditions.append(Task.id.in_(matching))
+    
+    return conditions
@@ -0,0 +1,90 @@
+# app/core/fieldsets.py
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from app.core.loaders import STRICT_LOADING
+
+# Campos que siempre se incluyen en una respuesta parcial
+ALWAYS_INCLUDED = ("id",)
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    Campos pedidos en ?fields=a,b,c validados contra el schema
+    
+    Devuelve una tupla ordenada (clave estable para el cache de schemas)
+    o None si no se pidió un subconjunto.
+    """
+    if not fields:
+        return None
+    
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos desconocidos: {', '.join(sorted(unknown))}"
+        )
+    
+    return tuple(sorted(requested | set(ALWAYS_INCLUDED)))
+
+
+@lru_cache(maxsize=256)
+def sparse_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Schema con solo los campos indicados, generado una vez por combinación"""
+    definitions = {
+        name: (schema.model_fields[name].annotation, schema.model_fields[name])
+        for name in fields
+    }
+    return create_model(
+        f"{schema.__name__}_{'_'.join(fields)}",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
+
+
+def fieldset_options(model, fields: Tuple[str, ...], extra_columns: Iterable[str] = ()) -> list:
+    """
+    Opciones de carga que traen solo las columnas pedidas
+    
+    Las columnas no pedidas quedan diferidas y no se consultan; las
+    relaciones pedidas se cargan con joinedload. Los campos calculados
+    (model.__computed_fields__) cargan con selectinload la relación de la
+    que dependen. extra_columns agrega columnas que se necesitan aunque
+    no se devuelvan (p. ej. el orden de la paginación).
+    """
+    mapper = inspect(model)
+    computed = getattr(model, "__computed_fields__", {})
+    column_names = set(extra_columns) | set(ALWAYS_INCLUDED)
+    options = []
+    
+    for name in fields:
+        if name in computed:
+            options.append(selectinload(getattr(model, computed[name])))
+        elif name in mapper.relationships:
+            relationship = mapper.relationships[name]
+            # La FK local es necesaria para resolver la relación
+            column_names.update(column.key for column in relationship.local_columns)
+            options.append(joinedload(getattr(model, name)))
+        elif name in mapper.column_attrs:
+            column_names.add(name)
+    
+    options.insert(0, load_only(
+        *[getattr(model, name) for name in sorted(column_names)],
+        raiseload=STRICT_LOADING
+    ))
+    return options
+
+
+def sparse_response(
+    rows: List[Any],
+    schema: Type[BaseModel],
+    headers: Optional[Dict[str, str]] = None
+) -> JSONResponse:
+    """Serializar filas con un schema parcial (fuera de response_model)"""
+    content = [schema.model_validate(row).model_dump(mode="json") for row in rows]
+    return JSONResponse(content=content, headers=headers)
@@ -0,0 +1,76 @@
+# app/core/loaders.py
+import os
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from app.models.board import Board
+from app.models.board_assignment import BoardAssignment
+from app.models.task import Task
+
+# Modo estricto: cualquier relación no planificada lanza error en lugar de
+# hacer un lazy load (útil en desarrollo y pruebas para detectar N+1)
+STRICT_LOADING = os.getenv("ORM_STRICT_LOADING", "false").lower() == "true"
+
+
+def _task_relationships(include_events: bool = True) -> list:
+    """Relaciones que serializa TaskOut (events alimenta TaskOut.record)"""
+    options = [
+        joinedload(Task.state),
+        joinedload(Task.assigned_to),
+        joinedload(Task.created_by),
+    ]
+    if include_events:
+        options.append(selectinload(Task.events))
+    return options
+
+
+def task_out_options(include_events: bool = True) -> list:
+    """
+    Opciones de carga para consultas de Task que se serializan con TaskOut
+    
+    Sin include_events el historial se carga aparte (p. ej. con
+    load_recent_events para record_preview).
+    """
+    options = _task_relationships(include_events)
+    if STRICT_LOADING:
+        options.append(raiseload("*"))
+    return options
+
+
+def board_summary_options() -> list:
+    """Opciones de carga para BoardSummaryOut: dueño, plantilla y asignaciones"""
+    options = [
+        joinedload(Board.owner),
+        joinedload(Board.template),
+        selectinload(Board.assignments).joinedload(BoardAssignment.user),
+    ]
+    if STRICT_LOADING:
+        options.append(raiseload("*"))
+    return options
+
+
+def board_out_options() -> list:
+    """Opciones de carga para BoardOut: lo de BoardSummaryOut más las tareas"""
+    tasks = selectinload(Board.tasks).options(*_task_relationships())
+    if STRICT_LOADING:
+        tasks = tasks.options(raiseload("*"))
+    return board_summary_options() + [tasks]
+
+
+def get_task_out(db: Session, task_id: int):
+    """Tarea con las relaciones de TaskOut cargadas (p. ej. tras un commit)"""
+    return db.query(Task).options(*task_out_options()).populate_existing().filter(
+        Task.id == task_id
+    ).first()
+
+
+def get_tasks_out(db: Session, task_ids) -> list:
+    """Varias tareas con las relaciones de TaskOut cargadas, en una consulta"""
+    return db.query(Task).options(*task_out_options()).populate_existing().filter(
+        Task.id.in_(task_ids)
+    ).all()
+
+
+def get_board_out(db: Session, board_id: int):
+    """Tablero con las relaciones de BoardOut cargadas (p. ej. tras un commit)"""
+    return db.query(Board).options(*board_out_options()).populate_existing().filter(
+        Board.id == board_id
+    ).first()
@@ -0,0 +1,105 @@
+# app/core/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+# Columnas por las que se puede paginar; el prefijo "-" indica orden descendente
+SORT_FIELDS = ("created_at", "-created_at", "updated_at", "-updated_at")
+
+MAX_PAGE_SIZE = 500
+
+# Máximo de entradas del historial por tarea en los listados (record_preview)
+MAX_RECORD_PREVIEW = 100
+
+
+def encode_cursor(sort: str, value: datetime, row_id: int) -> str:
+    """Token opaco con la posición (valor de orden, id) de la última fila"""
+    payload = json.dumps({"s": sort, "v": value.isoformat(), "id": row_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[datetime, int]:
+    """Posición codificada en un cursor (400 si es inválido o de otro orden)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort:
+            raise ValueError("orden distinto")
+        return datetime.fromisoformat(payload["v"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido para este orden")
+
+
+def validate_sort(sort: str) -> str:
+    """
+    Verificar el orden pedido (400 si no está en SORT_FIELDS)
+    
+    Los endpoints lo llaman antes de usar el nombre de la columna, por
+    ejemplo en las opciones de carga de ?fields=.
+    """
+    if sort not in SORT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Orden inválido (use uno de: {', '.join(SORT_FIELDS)})"
+        )
+    return sort
+
+
+def paginate_keyset(
+    query: Query,
+    model,
+    sort: str = "created_at",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> Tuple[List[Any], Optional[str], Optional[int]]:
+    """
+    Paginación por keyset sobre (columna de orden, id)
+    
+    Sin limit devuelve todas las filas (ordenadas) como antes. El total
+    solo se calcula cuando se pide, con una consulta COUNT aparte.
+    
+    Returns:
+        (filas, cursor de la página siguiente o None, total o None)
+    """
+    validate_sort(sort)
+    
+    descending = sort.startswith("-")
+    column = getattr(model, sort.lstrip("-"))
+    
+    total = query.order_by(None).count() if include_total else None
+    
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort)
+        position = tuple_(column, model.id)
+        query = query.filter(position < (value, row_id) if descending else position > (value, row_id))
+    
+    if descending:
+        query = query.order_by(column.desc(), model.id.desc())
+    else:
+        query = query.order_by(column.asc(), model.id.asc())
+    
+    if limit is None:
+        return query.all(), None, total
+    
+    # Una fila extra indica si hay página siguiente
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column.key), last.id)
+    
+    return rows, next_cursor, total
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total: Optional[int]) -> None:
+    """Exponer el cursor siguiente y el total (si se pidió) en headers"""
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
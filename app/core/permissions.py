@@ -1,4 +1,6 @@
 # app/core/permissions.py
+from typing import Iterable, List, Set
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.models.board import Board
@@ -126,6 +128,48 @@ class PermissionChecker:
         
         return False
     
+    @staticmethod
+    def get_member_board_ids(user: User, board_ids: Iterable[int], db: Session) -> Set[int]:
+        """
+        Tableros (de los indicados) donde el usuario es owner o está asignado
+        
+        Una sola consulta para cualquier cantidad de tableros.
+        """
+        board_ids = set(board_ids)
+        if not board_ids:
+            return set()
+        
+        assigned = select(BoardAssignment.board_id).where(BoardAssignment.user_id == user.id)
+        rows = db.query(Board.id).filter(
+            Board.id.in_(board_ids),
+            or_(Board.owner_id == user.id, Board.id.in_(assigned))
+        ).all()
+        return {board_id for (board_id,) in rows}
+    
+    @staticmethod
+    def get_editable_task_ids(user: User, tasks: List[Task], db: Session) -> Set[int]:
+        """
+        Versión por lotes de can_edit_task: IDs de las tareas que puede editar
+        
+        Aplica la misma matriz con una sola consulta de membresía para
+        todos los tableros involucrados.
+        """
+        role_name = user.role.name if user.role else None
+        
+        if role_name == "Administrador":
+            return {t.id for t in tasks}
+        
+        if role_name not in ["Manager", "Supervisor", "Agente"]:
+            return set()
+        
+        member_board_ids = PermissionChecker.get_member_board_ids(user, {t.board_id for t in tasks}, db)
+        
+        return {
+            t.id for t in tasks
+            if t.board_id in member_board_ids
+            and (role_name != "Agente" or t.assigned_to_id == user.id)
+        }
+    
     @staticmethod
     def get_editable_task_fields(user: User, task: Task) -> list:
         """
@@ -243,4 +287,21 @@ class PermissionChecker:
         
         # Combinar y eliminar duplicados
         all_boards = {b.id: b for b in owned_boards + assigned_boards}
-        return list(all_boards.values())
\ No newline at end of file
+        return list(all_boards.values())
+    
+    @staticmethod
+    def user_board_ids_select(user: User):
+        """
+        Subconsulta con los IDs de los tableros de get_user_boards
+        
+        Mismas reglas, para filtrar en SQL sin traer los tableros:
+        Admin ve todos; el resto, donde es owner o está asignado. Los
+        tableros archivados quedan fuera.
+        """
+        query = select(Board.id).where(Board.is_archived == False)
+        
+        if PermissionChecker.is_admin(user):
+            return query
+        
+        assigned = select(BoardAssignment.board_id).where(BoardAssignment.user_id == user.id)
+        return query.where(or_(Board.owner_id == user.id, Board.id.in_(assigned)))
\ No newline at end of file
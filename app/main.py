@@ -1,4 +1,5 @@
 # app/main.py
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -6,6 +7,7 @@ from datetime import datetime
 from sqlalchemy import text
 from app.api import tasks, workflow, roles, users, auth, boards, task_fields, analytics
 from app.core.database import Base, engine, SessionLocal
+from app.services.snapshot_service import snapshot_scheduler
 
 app = FastAPI(title="SGT_v1 - Backend")
 
@@ -19,11 +21,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
 # Crear tablas si no existen
 Base.metadata.create_all(bind=engine)
 
+# Snapshots diarios de analytics (opcional, en proceso)
+@app.on_event("startup")
+def start_snapshot_scheduler():
+    if os.getenv("ANALYTICS_SNAPSHOT_SCHEDULER", "false").lower() == "true":
+        snapshot_scheduler.start()
+
+@app.on_event("shutdown")
+def stop_snapshot_scheduler():
+    snapshot_scheduler.stop()
+
 # Health Check Endpoint (para CI/CD)
 @app.get("/api/v1/health")
 async def health_check():
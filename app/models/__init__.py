@@ -5,4 +5,9 @@ from app.models.workflow import WorkflowTemplate, WorkflowState
 from app.models.task import Task
 from app.models.board import Board
 from app.models.board_assignment import BoardAssignment
-from app.models.board_analytics import BoardAnalyticsSnapshot
\ No newline at end of file
+from app.models.board_analytics import BoardAnalyticsSnapshot
+from app.models.task_state_transition import TaskStateTransition
+from app.models.task_event import TaskEvent
+from app.models.analytics_job import AnalyticsJob
+from app.models.task_search import TaskSearchDocument
+from app.models.task_custom_field_value import TaskCustomFieldValue
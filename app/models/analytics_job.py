@@ -0,0 +1,38 @@
+# app/models/analytics_job.py
+import uuid
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Text, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class AnalyticsJob(Base):
+    """
+    Cálculo de analytics de un tablero ejecutado en segundo plano
+    
+    La tabla funciona como cola y almacén de resultados compartido entre
+    workers: un job terminado se reutiliza para los mismos parámetros
+    hasta expires_at.
+    """
+    __tablename__ = "analytics_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    
+    # Parámetros del cálculo; params_key los resume para buscar jobs reutilizables
+    params_key = Column(String(100), nullable=False)
+    days = Column(Integer, nullable=False)
+    start_date = Column(String(10), nullable=True)
+    end_date = Column(String(10), nullable=True)
+    
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    
+    requested_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_analytics_jobs_board_params", "board_id", "params_key", "expires_at"),
+    )
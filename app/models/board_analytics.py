@@ -1,5 +1,5 @@
 # app/models/board_analytics.py
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, JSON, Date
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, JSON, Date, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -19,7 +19,8 @@ class BoardAnalyticsSnapshot(Base):
     
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     
-    # Índice compuesto para búsquedas rápidas
+    # Índice compuesto para búsquedas rápidas (un snapshot por tablero y día)
     __table_args__ = (
+        Index("ix_board_analytics_snapshots_board_date", "board_id", "snapshot_date", unique=True),
         {"extend_existing": True}
     )
\ No newline at end of file
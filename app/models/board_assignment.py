@@ -1,5 +1,5 @@
 # app/models/board_assignment.py
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -14,4 +14,9 @@ class BoardAssignment(Base):
 
     # Relaciones
     board = relationship("Board", back_populates="assignments")
-    user = relationship("User", back_populates="board_assignments")
\ No newline at end of file
+    user = relationship("User", back_populates="board_assignments")
+
+    # Un usuario se asigna a lo sumo una vez por tablero
+    __table_args__ = (
+        UniqueConstraint("board_id", "user_id", name="uq_board_assignments_board_user"),
+    )
\ No newline at end of file
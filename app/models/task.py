@@ -1,5 +1,7 @@
 # app/models/task.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -10,7 +12,16 @@ class Task(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
-    record = Column(JSON, nullable=True, default=[])
+    # Historial anterior a task_events; ya no se escribe (ver Task.record)
+    legacy_record = Column("record", JSON, nullable=True, default=[])
+
+    # Historial de la tarea (comentarios y cambios de estado)
+    events = relationship(
+        "TaskEvent",
+        back_populates="task",
+        order_by="TaskEvent.id",
+        cascade="all, delete-orphan"
+    )
 
     # a qué tablero pertenece
     board_id = Column(Integer, ForeignKey("boards.id"), nullable=False)
@@ -32,8 +43,32 @@ class Task(Base):
     start_date = Column(DateTime, nullable=True)
     end_date = Column(DateTime, nullable=True)
 
-    # Campos personalizados en formato JSON
-    custom_fields = Column(JSON, nullable=True, default={})
+    # Campos personalizados en formato JSON (JSONB en Postgres, para filtrar con índice)
+    custom_fields = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True, default={})
+
+    # Valores desde Python (UTC): en SQLite se guardan siempre con microsegundos,
+    # el mismo formato con el que se comparan los cursores de paginación
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow, nullable=False)
+
+    # Campos de TaskOut que no son columnas: relación que hay que cargar
+    # para cada uno (lo usan las respuestas parciales con ?fields=)
+    __computed_fields__ = {"record": "events"}
+
+    @property
+    def record(self) -> list:
+        """Historial en el formato anterior de Task.record (compatibilidad con TaskOut)"""
+        return [event.to_record_entry() for event in self.events]
 
-    created_at = Column(DateTime, server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    # Índices compuestos para la paginación por keyset de las tareas de un tablero
+    __table_args__ = (
+        Index("ix_tasks_board_created_id", "board_id", "created_at", "id"),
+        Index("ix_tasks_board_updated_id", "board_id", "updated_at", "id"),
+        # Filtros cf.<campo> por contención (@>); los demás motores usan task_custom_field_values
+        Index(
+            "ix_tasks_custom_fields",
+            "custom_fields",
+            postgresql_using="gin",
+            postgresql_ops={"custom_fields": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
\ No newline at end of file
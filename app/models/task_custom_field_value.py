@@ -0,0 +1,23 @@
+# app/models/task_custom_field_value.py
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.core.database import Base
+
+class TaskCustomFieldValue(Base):
+    """
+    Índice clave/valor de Task.custom_fields (motores sin JSONB)
+    
+    Una fila por cada valor: los select tienen una, los multiselect una
+    por opción elegida. Los filtros cf.<campo> resuelven las tareas con el
+    índice (key, value, board_id) en lugar de leer el JSON de cada tarea.
+    En Postgres no se usa: custom_fields es JSONB con índice GIN.
+    """
+    __tablename__ = "task_custom_field_values"
+
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    value = Column(String(255), primary_key=True)
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_task_custom_field_values_key_value_board", "key", "value", "board_id"),
+    )
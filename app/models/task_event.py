@@ -0,0 +1,41 @@
+# app/models/task_event.py
+from datetime import timezone
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class TaskEvent(Base):
+    """
+    Historial de una tarea (solo inserción)
+    
+    Una fila por comentario o cambio de estado, con el momento real (UTC).
+    Reemplaza al JSON de Task.record, que se reescribía completo en cada
+    entrada y podía perder entradas con escrituras concurrentes.
+    """
+    __tablename__ = "task_events"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    task = relationship("Task", back_populates="events")
+    at = Column(DateTime, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    # Username al momento del evento (se muestra aunque el usuario ya no exista)
+    username = Column(String(50), nullable=False)
+    # Nombre del estado de la tarea en ese momento
+    status = Column(String, nullable=True)
+    doc = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_task_events_task_id_id", "task_id", "id"),
+    )
+
+    def to_record_entry(self) -> dict:
+        """Entrada en el formato de Task.record (fecha y hora locales)"""
+        local = self.at.replace(tzinfo=timezone.utc).astimezone()
+        return {
+            "fecha": local.strftime("%d/%m/%Y"),
+            "hora": local.strftime("%H:%M:%S"),
+            "user": self.username,
+            "status": self.status,
+            "doc": self.doc
+        }
@@ -0,0 +1,76 @@
+# app/models/task_search.py
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DDL, event
+from app.core.database import Base
+
+# Configuración de texto de Postgres (stemming y stopwords en español)
+SEARCH_CONFIG = "spanish"
+
+class TaskSearchDocument(Base):
+    """
+    Texto indexado para la búsqueda de tareas (una fila por tarea)
+    
+    Junta el título con la descripción y los comentarios del historial.
+    El índice depende del motor y se crea por DDL, no es una columna del
+    modelo: en Postgres, search_vector (tsvector generado desde title y
+    content) con índice GIN; en SQLite, la tabla FTS5 task_search_fts,
+    sincronizada con triggers. Ver app/services/task_search.py.
+    """
+    __tablename__ = "task_search_documents"
+
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    title = Column(String(200), nullable=False)
+    # Descripción y comentarios, separados por espacios
+    content = Column(Text, nullable=False, default="")
+
+
+_POSTGRES_DDL = [
+    f"""ALTER TABLE task_search_documents ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', content), 'B')
+    ) STORED""",
+    "CREATE INDEX ix_task_search_documents_vector ON task_search_documents USING gin (search_vector)",
+]
+
+_SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS task_search_fts USING fts5(
+        title, content,
+        content='task_search_documents', content_rowid='task_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS task_search_documents_ai AFTER INSERT ON task_search_documents BEGIN
+        INSERT INTO task_search_fts(rowid, title, content) VALUES (new.task_id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_search_documents_ad AFTER DELETE ON task_search_documents BEGIN
+        INSERT INTO task_search_fts(task_search_fts, rowid, title, content) VALUES ('delete', old.task_id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_search_documents_au AFTER UPDATE ON task_search_documents BEGIN
+        INSERT INTO task_search_fts(task_search_fts, rowid, title, content) VALUES ('delete', old.task_id, old.title, old.content);
+        INSERT INTO task_search_fts(rowid, title, content) VALUES (new.task_id, new.title, new.content);
+    END""",
+]
+
+for statement in _POSTGRES_DDL:
+    event.listen(TaskSearchDocument.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+for statement in _SQLITE_DDL:
+    event.listen(TaskSearchDocument.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+
+def create_sqlite_search_index(connection) -> None:
+    """
+    Crear task_search_fts y sus triggers en SQLite si faltan
+    
+    create_all lo hace en after_create; esto cubre las bases cuya tabla
+    task_search_documents se creó por migración. Después hay que
+    reconstruir el índice ('rebuild') para incluir los documentos existentes.
+    """
+    for statement in _SQLITE_DDL:
+        connection.exec_driver_sql(statement)
+
+
+event.listen(
+    TaskSearchDocument.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS task_search_fts").execute_if(dialect="sqlite")
+)
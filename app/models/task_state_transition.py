@@ -0,0 +1,26 @@
+# app/models/task_state_transition.py
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from app.core.database import Base
+
+class TaskStateTransition(Base):
+    """
+    Cambios de estado de las tareas (tabla angosta para analytics)
+    
+    Una fila por cada cambio de estado, con el momento (UTC) y el usuario
+    que lo realizó. Permite calcular tiempos reales en cada estado, cycle
+    time y lead time sin recorrer el JSON de Task.record.
+    """
+    __tablename__ = "task_state_transitions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    from_state_id = Column(Integer, ForeignKey("workflow_states.id"), nullable=True)
+    to_state_id = Column(Integer, ForeignKey("workflow_states.id"), nullable=False)
+    at = Column(DateTime, nullable=False)
+    actor_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        Index("ix_task_state_transitions_board_state_at", "board_id", "to_state_id", "at"),
+        Index("ix_task_state_transitions_task_at", "task_id", "at"),
+    )
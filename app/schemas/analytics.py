@@ -1,6 +1,7 @@
 # app/schemas/analytics.py
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+from datetime import datetime
 
 class OverviewMetrics(BaseModel):
     total_tasks: int
@@ -53,6 +54,24 @@ class DailyTrend(BaseModel):
     completed: int
     net: int
 
+class FlowMetrics(BaseModel):
+    avg_cycle_time_hours: float
+    avg_cycle_time_days: float
+    avg_lead_time_hours: float
+    avg_lead_time_days: float
+    completed_tasks: int
+
+class CycleTimePercentiles(BaseModel):
+    p50_hours: float
+    p85_hours: float
+    p95_hours: float
+    sample_size: int
+
+class CycleTimeBucket(BaseModel):
+    from_hours: float
+    to_hours: Optional[float] = None  # None en el último bucket (sin límite superior)
+    count: int
+
 class TasksByState(BaseModel):
     state_id: int
     state_name: str
@@ -68,6 +87,62 @@ class BoardAnalyticsResponse(BaseModel):
     time_in_states: Dict[str, StateTimeInfo]
     tasks_by_state: List[TasksByState]  # ✅ NUEVO
     trends: Dict[str, List[DailyTrend]]
+    flow: Optional[FlowMetrics] = None  # Cycle/lead time desde las transiciones de estado
+    cycle_time_percentiles: Optional[CycleTimePercentiles] = None
+    cycle_time_histogram: Optional[List[CycleTimeBucket]] = None
+    
+    class Config:
+        from_attributes = True
+
+# Diagrama de flujo acumulado
+class CumulativeFlowState(BaseModel):
+    state_id: int
+    state_name: str
+    state_order: int
+
+class CumulativeFlowDay(BaseModel):
+    date: str
+    source: str  # snapshot, live, missing
+    counts: Optional[Dict[str, int]] = None  # Tareas por nombre de estado (None si no hay snapshot)
+
+class CumulativeFlowResponse(BaseModel):
+    board_id: int
+    from_date: str
+    to_date: str
+    states: List[CumulativeFlowState]
+    days: List[CumulativeFlowDay]
+
+# Portafolio: métricas de todos los tableros accesibles
+class PortfolioBoardRow(BaseModel):
+    board_id: int
+    board_name: str
+    overview: OverviewMetrics
+    workload: List[WorkloadInfo]
+
+class PortfolioTotals(BaseModel):
+    boards_count: int
+    overview: OverviewMetrics
+    workload: List[WorkloadInfo]
+
+class PortfolioAnalyticsResponse(BaseModel):
+    boards: List[PortfolioBoardRow]
+    totals: PortfolioTotals
+
+
+# Jobs de analytics en segundo plano
+class AnalyticsJobResponse(BaseModel):
+    id: str
+    board_id: int
+    status: str  # queued, running, completed, failed
+    days: int
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: datetime
+    error: Optional[str] = None
+    result: Optional[BoardAnalyticsResponse] = None
     
     class Config:
         from_attributes = True
@@ -1,7 +1,7 @@
 # app/schemas/board.py
 from typing import Optional, List
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 # Importamos TaskOut desde task
 from .task import TaskOut
@@ -46,6 +46,17 @@ class BoardAssignmentCreate(BaseModel):
     """Schema para crear asignación"""
     user_id: int
 
+class BoardAssignmentsBulk(BaseModel):
+    """Schema para asignar y remover varios usuarios en una sola operación"""
+    add: List[int] = Field(default_factory=list, max_length=1000)
+    remove: List[int] = Field(default_factory=list, max_length=1000)
+
+class BoardAssignmentsBulkResult(BaseModel):
+    """Resultado de la operación masiva de asignaciones"""
+    added: int
+    already_assigned: int
+    removed: int
+
 class BoardOut(BaseModel):
     id: int
     name: str
@@ -64,4 +75,39 @@ class BoardOut(BaseModel):
     assignments: List[BoardAssignmentOut] = []
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BoardStateCount(BaseModel):
+    """Cantidad de tareas de un tablero en un estado"""
+    state_id: int
+    state_name: str
+    state_order: int
+    tasks_count: int
+
+class BoardSummaryOut(BaseModel):
+    """
+    Tablero sin sus tareas, para listados
+    
+    Las tareas completas se obtienen con /boards/{id}/tasks.
+    """
+    id: int
+    name: str
+    description: Optional[str] = None
+    color: Optional[str] = None
+    template_id: int
+    owner_id: int
+    is_archived: bool
+    created_at: datetime
+    updated_at: datetime
+    
+    # Relaciones
+    template: Optional[TemplateOut] = None
+    owner: Optional[OwnerOut] = None
+    assignments: List[BoardAssignmentOut] = []
+    
+    # Conteos de tareas
+    tasks_count: int = 0
+    tasks_by_state: List[BoardStateCount] = []
+
+    class Config:
+        from_attributes = True
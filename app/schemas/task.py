@@ -1,7 +1,7 @@
 # app/schemas/task.py
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 
 class StateInfo(BaseModel):
     """Información básica del estado de la tarea"""
@@ -69,6 +69,20 @@ class TaskUpdate(BaseModel):
             raise ValueError('end_date debe ser posterior o igual a start_date')
         return v
 
+class TaskImportRowError(BaseModel):
+    """Fila rechazada en una importación"""
+    line: int
+    error: str
+
+class TaskImportResult(BaseModel):
+    """Resultado de una importación masiva de tareas"""
+    total_rows: int
+    created: int
+    failed: int
+    errors: List[TaskImportRowError] = []
+    errors_truncated: bool = False
+    dry_run: bool = False
+
 # ✅ NUEVO: Schema para agregar una entrada al historial
 class TaskRecordAdd(BaseModel):
     """Schema para agregar un comentario al historial"""
@@ -98,6 +112,35 @@ class TaskOut(BaseModel):
     
     created_at: datetime
     updated_at: datetime
-
+    
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+MAX_BATCH_ITEMS = 500
+
+class TaskBatchItem(BaseModel):
+    """Cambios a aplicar a una tarea dentro de un lote"""
+    id: int
+    changes: TaskUpdate
+
+class TaskBatchUpdate(BaseModel):
+    """Schema para actualizar varias tareas en una sola operación"""
+    items: List[TaskBatchItem] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+class TaskBatchItemResult(BaseModel):
+    """Resultado de un elemento del lote"""
+    id: int
+    status: str  # "updated" o "error"
+    status_code: int = 200
+    error: Optional[str] = None
+    task: Optional[TaskOut] = None
+
+class TaskBatchResult(BaseModel):
+    """Resultado de una actualización por lotes"""
+    updated: int
+    failed: int
+    results: List[TaskBatchItemResult]
+
+class TaskSearchResult(TaskOut):
+    """Tarea encontrada por GET /tasks/search, con su relevancia"""
+    rank: float = 0.0
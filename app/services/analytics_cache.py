@@ -0,0 +1,136 @@
+# app/services/analytics_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class CacheBackend:
+    """
+    Interfaz de almacenamiento para el cache de analytics
+    
+    Además de pares clave/valor con TTL mantiene un contador de versión
+    por tablero. Un backend compartido (p. ej. Redis) permite que todos
+    los workers vean las mismas invalidaciones.
+    """
+    
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+    
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+    
+    def get_version(self, board_id: int) -> int:
+        raise NotImplementedError
+    
+    def bump_version(self, board_id: int) -> int:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Backend en proceso con expulsión LRU y expiración por TTL"""
+    
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            
+            # Marcar como usado recientemente
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if self.max_entries <= 0:
+            return
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            
+            # Expulsar las entradas menos usadas recientemente
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get_version(self, board_id: int) -> int:
+        with self._lock:
+            return self._versions.get(board_id, 0)
+    
+    def bump_version(self, board_id: int) -> int:
+        with self._lock:
+            version = self._versions.get(board_id, 0) + 1
+            self._versions[board_id] = version
+            return version
+
+
+class AnalyticsCache:
+    """
+    Cache de resultados de analytics por tablero
+    
+    La clave incluye la versión actual del tablero, que se incrementa con
+    cada escritura de tareas; las entradas viejas quedan inalcanzables y
+    salen por LRU. El TTL acota la antigüedad de métricas relativas al
+    momento actual (vencidas, tiempo en estado) aunque no haya escrituras.
+    """
+    
+    def __init__(self, backend: CacheBackend, ttl: float = 60):
+        self.backend = backend
+        self.ttl = ttl
+    
+    def _key(self, board_id: int, version: int, params: tuple) -> str:
+        return f"analytics:{board_id}:v{version}:" + ":".join(str(p) for p in params)
+    
+    def get_or_compute(
+        self,
+        board_id: int,
+        params: tuple,
+        compute: Callable[[], Any]
+    ) -> Tuple[Any, bool]:
+        """
+        Obtener el resultado cacheado o calcularlo y guardarlo
+        
+        Returns:
+            (resultado, True si vino del cache)
+        """
+        version = self.backend.get_version(board_id)
+        key = self._key(board_id, version, params)
+        
+        cached = self.backend.get(key)
+        if cached is not None:
+            return cached, True
+        
+        value = compute()
+        
+        # Si hubo escrituras durante el cálculo, la versión ya cambió y la
+        # entrada queda huérfana; no hace falta descartarla explícitamente
+        self.backend.set(key, value, self.ttl)
+        return value, False
+    
+    def invalidate_board(self, board_id: int) -> None:
+        """Invalidar los resultados de un tablero (llamar tras escribir tareas)"""
+        self.backend.bump_version(board_id)
+
+
+def configure_analytics_cache(backend: CacheBackend, ttl: Optional[float] = None) -> None:
+    """Reemplazar el backend del cache (p. ej. por uno compartido entre workers)"""
+    analytics_cache.backend = backend
+    if ttl is not None:
+        analytics_cache.ttl = ttl
+
+
+analytics_cache = AnalyticsCache(
+    InMemoryCacheBackend(max_entries=int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "512"))),
+    ttl=float(os.getenv("ANALYTICS_CACHE_TTL", "60"))
+)
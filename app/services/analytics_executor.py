@@ -0,0 +1,178 @@
+# app/services/analytics_executor.py
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.services.analytics_service import AnalyticsService
+
+# "parallel": cada sección en su propia conexión del pool
+# "sequential": todas las secciones sobre la sesión del request
+EXECUTION_MODE = os.getenv("ANALYTICS_EXECUTION_MODE", "parallel")
+# Secciones en ejecución a la vez (y conexiones ocupadas) entre todos los requests
+MAX_WORKERS = int(os.getenv("ANALYTICS_MAX_WORKERS", "4"))
+# Tiempo límite de cada sección, contado desde que empieza a ejecutarse
+SECTION_TIMEOUT = float(os.getenv("ANALYTICS_SECTION_TIMEOUT", "30"))
+# Tiempo máximo que una sección puede esperar un worker libre
+QUEUE_TIMEOUT = float(os.getenv("ANALYTICS_QUEUE_TIMEOUT", "10"))
+# Cada cuánto se revisan los plazos mientras hay secciones pendientes
+POLL_INTERVAL = 0.5
+
+# Pool exclusivo de los requests de analytics (los jobs corren en su propio worker)
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="analytics")
+
+
+class SectionTimeoutError(Exception):
+    """Una o más secciones de analytics excedieron su tiempo límite"""
+    
+    def __init__(self, sections: List[str], timeout: float):
+        self.sections = sections
+        self.timeout = timeout
+        names = ", ".join(f"'{name}'" for name in sections)
+        super().__init__(f"Secciones que excedieron el tiempo límite de {timeout:g}s: {names}")
+
+
+class AnalyticsBusyError(Exception):
+    """No hubo workers libres para ejecutar las secciones a tiempo"""
+    
+    def __init__(self, sections: List[str], queue_timeout: float):
+        self.sections = sections
+        self.queue_timeout = queue_timeout
+        names = ", ".join(f"'{name}'" for name in sections)
+        super().__init__(f"Analytics sin capacidad: {names} esperaron más de {queue_timeout:g}s un worker libre")
+
+
+def _apply_statement_timeout(db: Session, timeout: float) -> None:
+    """
+    En Postgres, cortar del lado de la base las consultas que superen el timeout
+    
+    SET LOCAL dura hasta el fin de la transacción, así que una sección
+    abandonada por el request no sigue ocupando la conexión.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"SET LOCAL statement_timeout = {max(1, int(timeout * 1000))}"))
+
+
+def _is_statement_timeout(error: OperationalError) -> bool:
+    # 57014 = query_canceled (statement_timeout)
+    return getattr(error.orig, "pgcode", None) == "57014"
+
+
+def _run_in_own_session(
+    name: str,
+    section: Callable[[Session], Any],
+    timeout: float,
+    started_at: Dict[str, float]
+) -> Tuple[Any, float]:
+    """Ejecutar una sección con una sesión propia y medir su duración (ms)"""
+    started = time.monotonic()
+    started_at[name] = started
+    db = SessionLocal()
+    try:
+        _apply_statement_timeout(db, timeout)
+        return section(db), (time.monotonic() - started) * 1000
+    except OperationalError as e:
+        if _is_statement_timeout(e):
+            raise SectionTimeoutError([name], timeout) from e
+        raise
+    finally:
+        db.close()
+
+
+def _run_sequential(sections: Dict[str, Callable[[Session], Any]], db: Session, timeout: float):
+    _apply_statement_timeout(db, timeout)
+    
+    results, timings = {}, {}
+    for name, section in sections.items():
+        started = time.monotonic()
+        try:
+            results[name] = section(db)
+        except OperationalError as e:
+            if _is_statement_timeout(e):
+                raise SectionTimeoutError([name], timeout) from e
+            raise
+        elapsed = time.monotonic() - started
+        if elapsed > timeout:
+            raise SectionTimeoutError([name], timeout)
+        timings[name] = elapsed * 1000
+    return results, timings
+
+
+def _run_parallel(sections: Dict[str, Callable[[Session], Any]], timeout: float):
+    started_at: Dict[str, float] = {}
+    submitted = time.monotonic()
+    futures = {
+        name: _executor.submit(_run_in_own_session, name, section, timeout, started_at)
+        for name, section in sections.items()
+    }
+    
+    def abort(error: Exception):
+        for future in futures.values():
+            future.cancel()
+        raise error
+    
+    pending = set(futures.values())
+    while pending:
+        done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception():
+                abort(future.exception())
+        
+        now = time.monotonic()
+        running = {name for name, future in futures.items() if future in pending and name in started_at}
+        overran = [name for name in running if now - started_at[name] > timeout]
+        if overran:
+            abort(SectionTimeoutError(overran, timeout))
+        
+        queued = [name for name, future in futures.items() if future in pending and name not in running]
+        if queued and now - submitted > QUEUE_TIMEOUT:
+            abort(AnalyticsBusyError(queued, QUEUE_TIMEOUT))
+    
+    results, timings = {}, {}
+    for name, future in futures.items():
+        results[name], timings[name] = future.result()
+    return results, timings
+
+
+def run_board_analytics(
+    board_id: int,
+    db: Session,
+    days: int = 30,
+    start_date: datetime = None,
+    end_date: datetime = None,
+    mode: str = None,
+    timeout: float = None
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Calcular BoardAnalyticsResponse ejecutando sus secciones
+    
+    En modo paralelo la latencia sigue a la sección más lenta en lugar de
+    a la suma de todas. El timeout se aplica a cada sección desde que
+    empieza a ejecutarse (el tiempo en cola tiene su propio límite) y, en
+    Postgres, también como statement_timeout de sus consultas.
+    
+    Returns:
+        (analytics, duración en ms por sección)
+    
+    Raises:
+        SectionTimeoutError: con las secciones que no terminaron dentro del timeout
+        AnalyticsBusyError: si las secciones no consiguen worker dentro de QUEUE_TIMEOUT
+    """
+    sections = AnalyticsService.get_board_sections(board_id, days, start_date, end_date)
+    timeout = timeout or SECTION_TIMEOUT
+    
+    if (mode or EXECUTION_MODE) == "parallel" and MAX_WORKERS > 1:
+        results, timings = _run_parallel(sections, timeout)
+    else:
+        results, timings = _run_sequential(sections, db, timeout)
+    
+    return AnalyticsService.merge_board_sections(results), timings
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Valor del header Server-Timing a partir de las duraciones por sección"""
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
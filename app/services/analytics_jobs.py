@@ -0,0 +1,152 @@
+# app/services/analytics_jobs.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.analytics_job import AnalyticsJob
+from app.models.user import User
+from app.services.analytics_executor import run_board_analytics
+
+# Tiempo que un resultado terminado se reutiliza para los mismos parámetros
+JOB_TTL = int(os.getenv("ANALYTICS_JOB_TTL", "900"))
+# Tiempo máximo de un job; pasado ese plazo un job pendiente se da por perdido
+JOB_TIMEOUT = float(os.getenv("ANALYTICS_JOB_TIMEOUT", "600"))
+JOB_WORKERS = int(os.getenv("ANALYTICS_JOB_WORKERS", "2"))
+
+_job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="analytics-job")
+
+
+def _parse_day(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, "%Y-%m-%d") if value else None
+
+
+class AnalyticsJobService:
+    """Cola de cálculos de analytics en segundo plano respaldada por la base de datos"""
+    
+    @staticmethod
+    def _params_key(days: int, start_date: Optional[str], end_date: Optional[str]) -> str:
+        return f"{days}:{start_date or ''}:{end_date or ''}"
+    
+    @staticmethod
+    def find_reusable(
+        board_id: int,
+        days: int,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        db: Session
+    ) -> Optional[AnalyticsJob]:
+        """
+        Job vigente con los mismos parámetros
+        
+        Sirve un job terminado que no expiró o uno pendiente que todavía
+        está dentro del tiempo máximo de ejecución.
+        """
+        now = datetime.utcnow()
+        candidates = db.query(AnalyticsJob).filter(
+            AnalyticsJob.board_id == board_id,
+            AnalyticsJob.params_key == AnalyticsJobService._params_key(days, start_date, end_date),
+            AnalyticsJob.expires_at > now,
+            AnalyticsJob.status != "failed"
+        ).order_by(AnalyticsJob.created_at.desc()).all()
+        
+        stale_before = now - timedelta(seconds=JOB_TIMEOUT)
+        for job in candidates:
+            if job.status == "completed":
+                return job
+            if job.created_at >= stale_before:
+                return job
+        return None
+    
+    @staticmethod
+    def submit(
+        board_id: int,
+        days: int,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        current_user: User,
+        db: Session
+    ) -> Tuple[AnalyticsJob, bool]:
+        """
+        Encolar el cálculo o reutilizar un job vigente
+        
+        Returns:
+            (job, True si se reutilizó uno existente)
+        """
+        existing = AnalyticsJobService.find_reusable(board_id, days, start_date, end_date, db)
+        if existing:
+            return existing, True
+        
+        now = datetime.utcnow()
+        
+        # Limpiar jobs expirados del tablero
+        db.query(AnalyticsJob).filter(
+            AnalyticsJob.board_id == board_id,
+            AnalyticsJob.expires_at <= now
+        ).delete(synchronize_session=False)
+        
+        job = AnalyticsJob(
+            board_id=board_id,
+            params_key=AnalyticsJobService._params_key(days, start_date, end_date),
+            days=days,
+            start_date=start_date,
+            end_date=end_date,
+            status="queued",
+            requested_by=current_user.id,
+            created_at=now,
+            # Provisorio: se extiende al terminar
+            expires_at=now + timedelta(seconds=JOB_TIMEOUT + JOB_TTL)
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        
+        _job_executor.submit(AnalyticsJobService.run_job, job.id)
+        return job, False
+    
+    @staticmethod
+    def run_job(job_id: str) -> None:
+        """Ejecutar un job en el worker con su propia sesión"""
+        db = SessionLocal()
+        try:
+            job = db.query(AnalyticsJob).filter(AnalyticsJob.id == job_id).first()
+            if not job or job.status != "queued":
+                return
+            
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            db.commit()
+            
+            end_date = _parse_day(job.end_date)
+            if end_date:
+                end_date = end_date.replace(hour=23, minute=59, second=59)
+            
+            try:
+                # Secuencial sobre la sesión del job: no ocupa el pool de los requests
+                analytics, _ = run_board_analytics(
+                    job.board_id,
+                    db,
+                    job.days,
+                    _parse_day(job.start_date),
+                    end_date,
+                    mode="sequential",
+                    timeout=JOB_TIMEOUT
+                )
+                job.result = analytics
+                job.status = "completed"
+            except Exception as e:
+                db.rollback()
+                job.error = str(e)
+                job.status = "failed"
+                print(f"❌ Error en job de analytics {job_id}: {e}")
+            
+            job.finished_at = datetime.utcnow()
+            job.expires_at = job.finished_at + timedelta(seconds=JOB_TTL)
+            db.commit()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def get_job(job_id: str, db: Session) -> Optional[AnalyticsJob]:
+        return db.query(AnalyticsJob).filter(AnalyticsJob.id == job_id).first()
@@ -1,56 +1,306 @@
 # app/services/analytics_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case, and_, or_
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from sqlalchemy import func, case, and_, or_, cast, Integer, select, union_all
+from datetime import date, datetime, time, timedelta
+from itertools import chain
+from typing import Callable, Dict, List, Optional, Any
 from app.models.task import Task
 from app.models.board import Board
 from app.models.workflow import WorkflowState
 from app.models.user import User
+from app.models.board_analytics import BoardAnalyticsSnapshot
+from app.models.task_state_transition import TaskStateTransition
+
+EPOCH = datetime(1970, 1, 1)
+
+# Distribución del tiempo de completado: percentiles reportados e histograma
+# de buckets fijos (el último acumula todo lo que supera el rango)
+CYCLE_TIME_PERCENTILES = (0.5, 0.85, 0.95)
+CYCLE_TIME_BUCKET_HOURS = 24
+CYCLE_TIME_BUCKETS = 14
+
+
+def _to_epoch(value: datetime) -> float:
+    """Segundos desde epoch de un datetime naive (UTC)"""
+    return (value - EPOCH).total_seconds()
+
+
+def _epoch(column, db: Session):
+    """Expresión SQL con los segundos desde epoch de una columna DateTime"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.extract("epoch", column)
+    if dialect == "sqlite":
+        return (func.julianday(column) - 2440587.5) * 86400.0
+    return func.unix_timestamp(column)
+
+
+def _day_bucket(column, start: datetime, db: Session):
+    """
+    Índice del día (desde start) en el que cae una columna DateTime
+    
+    Los días son ventanas de 24h contadas a partir de start, no días
+    calendario. Se asume column >= start y start sin microsegundos.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        # Segundos enteros y división entera: exacto con start en segundos enteros.
+        # Se recorta la fracción antes de strftime, que redondea a milisegundos.
+        whole_seconds = func.strftime("%s", func.substr(column, 1, 19))
+        seconds = cast(whole_seconds, Integer) - int(_to_epoch(start))
+        return seconds // 86400
+    return func.floor((_epoch(column, db) - _to_epoch(start)) / 86400)
+
 
 class AnalyticsService:
     """Servicio para calcular métricas y estadísticas de tableros"""
     
+    # ========================================================================
+    # AGREGACIÓN POR ESTADO (una sola consulta GROUP BY)
+    # ========================================================================
+    
     @staticmethod
-    def get_board_overview(board_id: int, db: Session) -> Dict[str, Any]:
-        """Resumen general del tablero"""
-        
-        # Total de tareas
-        total_tasks = db.query(Task).filter(Task.board_id == board_id).count()
-        
-        # Obtener estados del workflow
+    def _get_board_states(board_id: int, db: Session):
+        """Obtener el tablero y los estados de su workflow ordenados"""
         board = db.query(Board).filter(Board.id == board_id).first()
         if not board:
-            return {}
+            return None, []
         
         states = db.query(WorkflowState).filter(
             WorkflowState.workflow_id == board.template_id
         ).order_by(WorkflowState.order).all()
         
-        # Identificar estado final (último en el orden)
+        return board, states
+    
+    @staticmethod
+    def _get_states_by_template(template_ids: List[int], db: Session) -> Dict[int, List[WorkflowState]]:
+        """Estados ordenados de varias plantillas en una sola consulta"""
+        states_by_template = {}
+        if not template_ids:
+            return states_by_template
+        
+        states = db.query(WorkflowState).filter(
+            WorkflowState.workflow_id.in_(template_ids)
+        ).order_by(WorkflowState.workflow_id, WorkflowState.order).all()
+        
+        for state in states:
+            states_by_template.setdefault(state.workflow_id, []).append(state)
+        
+        return states_by_template
+    
+    @staticmethod
+    def _aggregate_by_state(
+        board_ids: List[int],
+        db: Session,
+        now: datetime,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> Dict[int, Dict[int, Dict[str, Any]]]:
+        """
+        Conteos, antigüedad promedio y vencidas por (tablero, estado)
+        
+        Una sola consulta GROUP BY con agregados condicionales. Devuelve
+        {board_id: {state_id: {tasks_count, filtered_count, avg_age_hours, overdue}}}
+        donde filtered_count aplica el rango de fechas sobre created_at y
+        avg_age_hours es el tiempo promedio desde que cada tarea entró a su
+        estado actual (último cambio de estado o, si no hubo, su creación).
+        """
+        if not board_ids:
+            return {}
+        
+        date_filters = []
+        if start_date:
+            date_filters.append(Task.created_at >= start_date)
+        if end_date:
+            date_filters.append(Task.created_at <= end_date)
+        
+        if date_filters:
+            filtered_count = func.sum(case((and_(*date_filters), 1), else_=0))
+        else:
+            filtered_count = func.count(Task.id)
+        
+        # Momento de entrada al estado actual
+        last_transition = db.query(
+            TaskStateTransition.task_id,
+            func.max(TaskStateTransition.at).label("entered_at")
+        ).filter(
+            TaskStateTransition.board_id.in_(board_ids)
+        ).group_by(TaskStateTransition.task_id).subquery()
+        entered_at = func.coalesce(last_transition.c.entered_at, Task.created_at)
+        
+        rows = db.query(
+            Task.board_id,
+            Task.state_id,
+            func.count(Task.id),
+            filtered_count,
+            func.avg(_epoch(entered_at, db)),
+            func.sum(case((Task.end_date < now, 1), else_=0))
+        ).outerjoin(
+            last_transition, last_transition.c.task_id == Task.id
+        ).filter(
+            Task.board_id.in_(board_ids)
+        ).group_by(Task.board_id, Task.state_id).all()
+        
+        now_epoch = _to_epoch(now)
+        aggregates = {}
+        for board_id, state_id, count, filtered, avg_entered, overdue in rows:
+            avg_age = (now_epoch - float(avg_entered)) / 3600 if avg_entered is not None else 0
+            aggregates.setdefault(board_id, {})[state_id] = {
+                "tasks_count": count,
+                "filtered_count": int(filtered or 0),
+                "avg_age_hours": avg_age,
+                "overdue": int(overdue or 0)
+            }
+        
+        return aggregates
+    
+    @staticmethod
+    def _aggregate_states_as_of(board_ids: List[int], db: Session, as_of: datetime) -> Dict[int, Dict[int, Dict[str, Any]]]:
+        """
+        Conteos y vencidas por (tablero, estado) tal como estaban en as_of
+        
+        Solo cuenta las tareas creadas antes de as_of. El estado de cada una
+        se reconstruye con task_state_transitions: el destino de la última
+        transición anterior a as_of o, si no la hay, el origen de la primera
+        posterior (el estado con el que se creó); sin transiciones, el
+        estado actual. Las tareas eliminadas desde entonces no se cuentan.
+        Devuelve {board_id: {state_id: {tasks_count, overdue}}}.
+        """
+        if not board_ids:
+            return {}
+        
+        last_before = select(
+            TaskStateTransition.task_id,
+            TaskStateTransition.to_state_id,
+            func.row_number().over(
+                partition_by=TaskStateTransition.task_id,
+                order_by=(TaskStateTransition.at.desc(), TaskStateTransition.id.desc())
+            ).label("position")
+        ).where(
+            TaskStateTransition.board_id.in_(board_ids),
+            TaskStateTransition.at < as_of
+        ).subquery()
+        
+        first_after = select(
+            TaskStateTransition.task_id,
+            TaskStateTransition.from_state_id,
+            func.row_number().over(
+                partition_by=TaskStateTransition.task_id,
+                order_by=(TaskStateTransition.at, TaskStateTransition.id)
+            ).label("position")
+        ).where(
+            TaskStateTransition.board_id.in_(board_ids),
+            TaskStateTransition.at >= as_of
+        ).subquery()
+        
+        state_id = func.coalesce(last_before.c.to_state_id, first_after.c.from_state_id, Task.state_id)
+        
+        rows = db.query(
+            Task.board_id,
+            state_id,
+            func.count(Task.id),
+            func.sum(case((Task.end_date < as_of, 1), else_=0))
+        ).outerjoin(
+            last_before, and_(last_before.c.task_id == Task.id, last_before.c.position == 1)
+        ).outerjoin(
+            first_after, and_(first_after.c.task_id == Task.id, first_after.c.position == 1)
+        ).filter(
+            Task.board_id.in_(board_ids),
+            Task.created_at < as_of
+        ).group_by(Task.board_id, state_id).all()
+        
+        aggregates = {}
+        for board_id, state, count, overdue in rows:
+            aggregates.setdefault(board_id, {})[state] = {
+                "tasks_count": count,
+                "overdue": int(overdue or 0)
+            }
+        
+        return aggregates
+    
+    @staticmethod
+    def _get_dwell_by_state(board_id: int, db: Session, now: datetime) -> Dict[int, float]:
+        """
+        Tiempo promedio (horas) que las tareas permanecen en cada estado
+        
+        Cada estancia va desde la entrada al estado hasta el siguiente cambio
+        (LEAD sobre las transiciones de la tarea) o hasta ahora si sigue ahí.
+        La estancia inicial va desde la creación hasta la primera transición.
+        """
+        ordered = select(
+            TaskStateTransition.task_id,
+            TaskStateTransition.from_state_id,
+            TaskStateTransition.to_state_id,
+            TaskStateTransition.at,
+            func.lead(TaskStateTransition.at).over(
+                partition_by=TaskStateTransition.task_id,
+                order_by=(TaskStateTransition.at, TaskStateTransition.id)
+            ).label("left_at"),
+            func.row_number().over(
+                partition_by=TaskStateTransition.task_id,
+                order_by=(TaskStateTransition.at, TaskStateTransition.id)
+            ).label("position")
+        ).where(TaskStateTransition.board_id == board_id).cte("ordered_transitions")
+        
+        first_transition = select(
+            ordered.c.task_id,
+            ordered.c.from_state_id,
+            ordered.c.at
+        ).where(ordered.c.position == 1).subquery()
+        
+        stays = union_all(
+            # Estancias que empiezan con un cambio de estado
+            select(
+                ordered.c.to_state_id.label("state_id"),
+                ordered.c.at.label("entered_at"),
+                ordered.c.left_at.label("left_at")
+            ),
+            # Estancia inicial de cada tarea
+            select(
+                func.coalesce(first_transition.c.from_state_id, Task.state_id).label("state_id"),
+                Task.created_at.label("entered_at"),
+                first_transition.c.at.label("left_at")
+            ).select_from(Task).outerjoin(
+                first_transition, first_transition.c.task_id == Task.id
+            ).where(Task.board_id == board_id)
+        ).subquery()
+        
+        dwell_seconds = (
+            func.coalesce(_epoch(stays.c.left_at, db), _to_epoch(now))
+            - _epoch(stays.c.entered_at, db)
+        )
+        rows = db.query(
+            stays.c.state_id,
+            func.avg(dwell_seconds)
+        ).group_by(stays.c.state_id).all()
+        
+        return {
+            state_id: float(avg_seconds) / 3600
+            for state_id, avg_seconds in rows if avg_seconds is not None
+        }
+    
+    @staticmethod
+    def _build_overview(states: List[WorkflowState], by_state: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+        """Resumen general a partir de los agregados por estado"""
+        total_tasks = sum(a["tasks_count"] for a in by_state.values())
+        
+        # Identificar estado inicial y final (primero y último en el orden)
+        initial_state_id = states[0].id if states else None
         final_state_id = states[-1].id if states else None
         
         # Tareas completadas (en el último estado)
-        completed = db.query(Task).filter(
-            Task.board_id == board_id,
-            Task.state_id == final_state_id
-        ).count() if final_state_id else 0
+        completed = by_state.get(final_state_id, {}).get("tasks_count", 0) if final_state_id else 0
         
         # Tareas en progreso (no en estado inicial ni final)
-        initial_state_id = states[0].id if states else None
-        in_progress = db.query(Task).filter(
-            Task.board_id == board_id,
-            Task.state_id != final_state_id,
-            Task.state_id != initial_state_id
-        ).count() if len(states) > 1 else 0
+        in_progress = sum(
+            a["tasks_count"] for state_id, a in by_state.items()
+            if state_id not in (initial_state_id, final_state_id)
+        ) if len(states) > 1 else 0
         
         # Tareas vencidas (con end_date pasado y no completadas)
-        now = datetime.utcnow()
-        overdue = db.query(Task).filter(
-            Task.board_id == board_id,
-            Task.state_id != final_state_id,
-            Task.end_date < now
-        ).count() if final_state_id else 0
+        overdue = sum(
+            a["overdue"] for state_id, a in by_state.items()
+            if state_id != final_state_id
+        ) if final_state_id else 0
         
         # Tasa de completado
         completion_rate = (completed / total_tasks * 100) if total_tasks > 0 else 0
@@ -64,63 +314,170 @@ class AnalyticsService:
             "completion_rate": round(completion_rate, 1)
         }
     
+    @staticmethod
+    def _build_bottlenecks(states: List[WorkflowState], by_state: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Cuellos de botella a partir de los agregados por estado"""
+        bottlenecks = []
+        
+        for state in states:
+            aggregate = by_state.get(state.id)
+            if not aggregate or not aggregate["tasks_count"]:
+                continue
+            
+            tasks_count = aggregate["tasks_count"]
+            # Tiempo promedio desde que las tareas actuales entraron al estado
+            avg_time = aggregate["avg_age_hours"]
+            
+            # Determinar severidad
+            severity = "low"
+            if tasks_count > 10 and avg_time > 48:
+                severity = "high"
+            elif tasks_count > 5 or avg_time > 24:
+                severity = "medium"
+            
+            bottlenecks.append({
+                "state_id": state.id,
+                "state_name": state.name,
+                "state_order": state.order,
+                "tasks_count": tasks_count,
+                "avg_time_hours": round(avg_time, 1),
+                "avg_time_days": round(avg_time / 24, 1),
+                "severity": severity
+            })
+        
+        # Ordenar por severidad y cantidad de tareas
+        severity_order = {"high": 0, "medium": 1, "low": 2}
+        bottlenecks.sort(key=lambda x: (severity_order[x["severity"]], -x["tasks_count"]))
+        
+        return bottlenecks
+    
+    @staticmethod
+    def _build_time_in_states(
+        states: List[WorkflowState],
+        by_state: Dict[int, Dict[str, Any]],
+        dwell_by_state: Dict[int, float]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Tiempo promedio por estado a partir de las estancias y los agregados"""
+        time_in_states = {}
+        
+        for state in states:
+            avg_time = dwell_by_state.get(state.id, 0)
+            
+            time_in_states[state.name] = {
+                "avg_hours": round(avg_time, 1),
+                "avg_days": round(avg_time / 24, 1),
+                "tasks_count": by_state.get(state.id, {}).get("tasks_count", 0),
+                "state_order": state.order
+            }
+        
+        return time_in_states
+    
+    @staticmethod
+    def _build_tasks_by_state(states: List[WorkflowState], by_state: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Distribución por estado (con filtro de fechas) a partir de los agregados"""
+        return [
+            {
+                "state_id": state.id,
+                "state_name": state.name,
+                "state_order": state.order,
+                "tasks_count": by_state.get(state.id, {}).get("filtered_count", 0)
+            }
+            for state in states
+        ]
+    
+    @staticmethod
+    def get_state_metrics(
+        board_id: int,
+        db: Session,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> Dict[str, Any]:
+        """
+        Overview, cuellos de botella, tiempo por estado y distribución por estado
+        
+        Comparten una única agregación GROUP BY state_id; el tiempo por
+        estado suma una consulta sobre las transiciones.
+        """
+        board, states = AnalyticsService._get_board_states(board_id, db)
+        if not board:
+            return {"overview": {}, "bottlenecks": [], "time_in_states": {}, "tasks_by_state": []}
+        
+        now = datetime.utcnow()
+        by_state = AnalyticsService._aggregate_by_state(
+            [board_id], db, now, start_date, end_date
+        ).get(board_id, {})
+        dwell_by_state = AnalyticsService._get_dwell_by_state(board_id, db, now)
+        
+        return {
+            "overview": AnalyticsService._build_overview(states, by_state),
+            "bottlenecks": AnalyticsService._build_bottlenecks(states, by_state),
+            "time_in_states": AnalyticsService._build_time_in_states(states, by_state, dwell_by_state),
+            "tasks_by_state": AnalyticsService._build_tasks_by_state(states, by_state)
+        }
+    
+    # ========================================================================
+    # MÉTRICAS INDIVIDUALES
+    # ========================================================================
+    
+    @staticmethod
+    def get_board_overview(board_id: int, db: Session) -> Dict[str, Any]:
+        """Resumen general del tablero"""
+        board, states = AnalyticsService._get_board_states(board_id, db)
+        if not board:
+            return {}
+        
+        by_state = AnalyticsService._aggregate_by_state([board_id], db, datetime.utcnow()).get(board_id, {})
+        return AnalyticsService._build_overview(states, by_state)
+    
     @staticmethod
     def get_productivity_metrics(
         board_id: int, 
         db: Session, 
         days: int = 30
     ) -> Dict[str, Any]:
-        """Métricas de productividad"""
+        """
+        Métricas de productividad
         
-        start_date = datetime.utcnow() - timedelta(days=days)
+        Conteos y promedio de completado en una sola consulta con agregados
+        condicionales, sin cargar las tareas.
+        """
+        now = datetime.utcnow()
+        start_date = now - timedelta(days=days)
+        week_ago = now - timedelta(days=7)
+        two_weeks_ago = now - timedelta(days=14)
         
         # Obtener estado final
-        board = db.query(Board).filter(Board.id == board_id).first()
+        board, states = AnalyticsService._get_board_states(board_id, db)
         if not board:
             return {}
         
-        states = db.query(WorkflowState).filter(
-            WorkflowState.workflow_id == board.template_id
-        ).order_by(WorkflowState.order).all()
-        
         final_state_id = states[-1].id if states else None
         
-        # Tareas completadas en el periodo
-        completed_tasks = db.query(Task).filter(
+        in_period = Task.updated_at >= start_date
+        completion_seconds = _epoch(Task.updated_at, db) - _epoch(Task.created_at, db)
+        
+        completed_in_period, avg_completion_seconds, this_week, last_week = db.query(
+            func.sum(case((in_period, 1), else_=0)),
+            func.avg(case((in_period, completion_seconds), else_=None)),
+            func.sum(case((Task.updated_at >= week_ago, 1), else_=0)),
+            func.sum(case((and_(Task.updated_at >= two_weeks_ago, Task.updated_at < week_ago), 1), else_=0))
+        ).filter(
             Task.board_id == board_id,
             Task.state_id == final_state_id,
-            Task.updated_at >= start_date
-        ).all()
+            Task.updated_at >= min(start_date, two_weeks_ago)
+        ).one()
         
-        # Calcular tiempo promedio de completado
-        completion_times = []
-        for task in completed_tasks:
-            if task.created_at and task.updated_at:
-                delta = task.updated_at - task.created_at
-                completion_times.append(delta.total_seconds() / 3600)  # horas
+        completed_in_period = int(completed_in_period or 0)
+        this_week = int(this_week or 0)
+        last_week = int(last_week or 0)
         
-        avg_completion_time = sum(completion_times) / len(completion_times) if completion_times else 0
+        # Tiempo promedio de completado en horas
+        avg_completion_time = float(avg_completion_seconds) / 3600 if avg_completion_seconds is not None else 0
         
         # Tareas por día
-        tasks_per_day = len(completed_tasks) / days if days > 0 else 0
+        tasks_per_day = completed_in_period / days if days > 0 else 0
         
         # Velocidad semanal (últimas 2 semanas para comparar)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        two_weeks_ago = datetime.utcnow() - timedelta(days=14)
-        
-        this_week = db.query(Task).filter(
-            Task.board_id == board_id,
-            Task.state_id == final_state_id,
-            Task.updated_at >= week_ago
-        ).count()
-        
-        last_week = db.query(Task).filter(
-            Task.board_id == board_id,
-            Task.state_id == final_state_id,
-            Task.updated_at >= two_weeks_ago,
-            Task.updated_at < week_ago
-        ).count()
-        
         velocity_trend = ((this_week - last_week) / last_week * 100) if last_week > 0 else 0
         
         return {
@@ -132,126 +489,233 @@ class AnalyticsService:
                 "last_week": last_week,
                 "trend_percent": round(velocity_trend, 1)
             },
-            "completed_in_period": len(completed_tasks)
+            "completed_in_period": completed_in_period
         }
     
     @staticmethod
-    def get_bottlenecks(board_id: int, db: Session) -> List[Dict[str, Any]]:
-        """Detectar cuellos de botella por estado"""
+    def _percentiles_from_sorted(rows, percentiles) -> Dict[float, float]:
+        """
+        Percentiles con interpolación lineal (como percentile_cont) sobre
+        valores que llegan ordenados, reteniendo solo los que se necesitan
         
-        board = db.query(Board).filter(Board.id == board_id).first()
-        if not board:
-            return []
+        Cada fila es (valor, total de filas): el total viaja en la misma
+        consulta (count() over ()), así que no puede diferir del stream.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return {p: 0.0 for p in percentiles}
         
-        states = db.query(WorkflowState).filter(
-            WorkflowState.workflow_id == board.template_id
-        ).order_by(WorkflowState.order).all()
+        count = first[1]
+        positions = {p: p * (count - 1) for p in percentiles}
+        needed = set()
+        for position in positions.values():
+            needed.add(int(position))
+            needed.add(min(int(position) + 1, count - 1))
         
-        bottlenecks = []
+        picked = {}
+        for index, (value, _) in enumerate(chain([first], rows)):
+            if index in needed:
+                picked[index] = float(value)
+            if index >= max(needed):
+                break
         
-        for state in states:
-            # Contar tareas en este estado
-            tasks_in_state = db.query(Task).filter(
-                Task.board_id == board_id,
-                Task.state_id == state.id
-            ).all()
-            
-            if not tasks_in_state:
-                continue
-            
-            # Calcular tiempo promedio en este estado
-            times = []
-            for task in tasks_in_state:
-                if task.updated_at and task.created_at:
-                    # Aproximación: diferencia entre created_at y updated_at
-                    delta = datetime.utcnow() - task.updated_at
-                    times.append(delta.total_seconds() / 3600)  # horas
-            
-            avg_time = sum(times) / len(times) if times else 0
+        result = {}
+        for p, position in positions.items():
+            lower = int(position)
+            upper = min(lower + 1, count - 1)
+            result[p] = picked[lower] + (picked[upper] - picked[lower]) * (position - lower)
+        return result
+    
+    @staticmethod
+    def _completed_flow_times(board_id: int, final_state_id: int, period_start: datetime, db: Session):
+        """
+        Subconsulta con las tareas completadas en el periodo según sus transiciones
+        
+        Una fila por tarea en el estado final cuya última llegada a ese
+        estado cae en el periodo: started_at (primer cambio de estado),
+        completed_at (llegada al estado final) y created_at. Es la población
+        de get_flow_metrics y de get_cycle_time_distribution.
+        """
+        per_task = db.query(
+            TaskStateTransition.task_id,
+            func.min(TaskStateTransition.at).label("started_at"),
+            func.max(
+                case((TaskStateTransition.to_state_id == final_state_id, TaskStateTransition.at), else_=None)
+            ).label("completed_at")
+        ).filter(
+            TaskStateTransition.board_id == board_id
+        ).group_by(TaskStateTransition.task_id).subquery()
+        
+        return db.query(
+            per_task.c.task_id,
+            per_task.c.started_at,
+            per_task.c.completed_at,
+            Task.created_at
+        ).join(
+            Task, per_task.c.task_id == Task.id
+        ).filter(
+            Task.board_id == board_id,
+            Task.state_id == final_state_id,
+            per_task.c.completed_at >= period_start
+        ).subquery()
+    
+    @staticmethod
+    def get_cycle_time_distribution(board_id: int, db: Session, days: int = 30) -> Dict[str, Any]:
+        """
+        Percentiles e histograma del cycle time
+        
+        Misma población y definición que el cycle time de get_flow_metrics:
+        tareas completadas en el periodo según sus transiciones, midiendo
+        primer cambio de estado → llegada al estado final. En PostgreSQL se
+        usan percentile_cont y width_bucket; en otros motores se recorren
+        los valores ordenados en streaming.
+        """
+        board, states = AnalyticsService._get_board_states(board_id, db)
+        if not board or not states:
+            return {}
+        
+        completed = AnalyticsService._completed_flow_times(
+            board_id, states[-1].id, datetime.utcnow() - timedelta(days=days), db
+        )
+        hours = (_epoch(completed.c.completed_at, db) - _epoch(completed.c.started_at, db)) / 3600.0
+        histogram_limit = CYCLE_TIME_BUCKET_HOURS * CYCLE_TIME_BUCKETS
+        
+        # Conteos por bucket: 1..CYCLE_TIME_BUCKETS y CYCLE_TIME_BUCKETS + 1 para el excedente
+        bucket_counts = {}
+        
+        if db.get_bind().dialect.name == "postgresql":
+            row = db.query(
+                func.count(),
+                *[func.percentile_cont(p).within_group(hours) for p in CYCLE_TIME_PERCENTILES]
+            ).select_from(completed).one()
+            count = row[0]
+            percentiles = {
+                p: float(value) if value is not None else 0.0
+                for p, value in zip(CYCLE_TIME_PERCENTILES, row[1:])
+            }
             
-            # Determinar severidad
-            severity = "low"
-            if len(tasks_in_state) > 10 and avg_time > 48:
-                severity = "high"
-            elif len(tasks_in_state) > 5 or avg_time > 24:
-                severity = "medium"
+            bucket = func.width_bucket(hours, 0, histogram_limit, CYCLE_TIME_BUCKETS)
+            for bucket_index, bucket_count in db.query(bucket, func.count()).select_from(
+                completed
+            ).group_by(bucket).all():
+                # Los valores negativos (bucket 0) se cuentan en el primero
+                index = max(int(bucket_index), 1)
+                bucket_counts[index] = bucket_counts.get(index, 0) + bucket_count
+        else:
+            def stream_hours():
+                query = db.query(
+                    hours.label("hours"), func.count().over()
+                ).select_from(completed).order_by(hours).yield_per(1000)
+                for value, total in query:
+                    value = float(value)
+                    index = min(max(int(value // CYCLE_TIME_BUCKET_HOURS) + 1, 1), CYCLE_TIME_BUCKETS + 1)
+                    bucket_counts[index] = bucket_counts.get(index, 0) + 1
+                    yield value, total
             
-            bottlenecks.append({
-                "state_id": state.id,
-                "state_name": state.name,
-                "state_order": state.order,
-                "tasks_count": len(tasks_in_state),
-                "avg_time_hours": round(avg_time, 1),
-                "avg_time_days": round(avg_time / 24, 1),
-                "severity": severity
-            })
+            # Se consume todo el stream para completar el histograma
+            rows = stream_hours()
+            percentiles = AnalyticsService._percentiles_from_sorted(rows, CYCLE_TIME_PERCENTILES)
+            for _ in rows:
+                pass
+            count = sum(bucket_counts.values())
         
-        # Ordenar por severidad y cantidad de tareas
-        severity_order = {"high": 0, "medium": 1, "low": 2}
-        bottlenecks.sort(key=lambda x: (severity_order[x["severity"]], -x["tasks_count"]))
+        histogram = []
+        for index in range(1, CYCLE_TIME_BUCKETS + 2):
+            from_hours = (index - 1) * CYCLE_TIME_BUCKET_HOURS
+            histogram.append({
+                "from_hours": from_hours,
+                "to_hours": from_hours + CYCLE_TIME_BUCKET_HOURS if index <= CYCLE_TIME_BUCKETS else None,
+                "count": bucket_counts.get(index, 0)
+            })
         
-        return bottlenecks
+        return {
+            "percentiles": {
+                "p50_hours": round(percentiles[0.5], 1),
+                "p85_hours": round(percentiles[0.85], 1),
+                "p95_hours": round(percentiles[0.95], 1),
+                "sample_size": count
+            },
+            "histogram": histogram
+        }
     
     @staticmethod
-    def get_workload_distribution(board_id: int, db: Session) -> List[Dict[str, Any]]:
-        """Distribución de carga de trabajo por usuario"""
-        
-        # Obtener todos los usuarios asignados al tablero
-        board = db.query(Board).filter(Board.id == board_id).first()
+    def get_bottlenecks(board_id: int, db: Session) -> List[Dict[str, Any]]:
+        """Detectar cuellos de botella por estado"""
+        board, states = AnalyticsService._get_board_states(board_id, db)
         if not board:
             return []
         
-        # Obtener estado final
-        states = db.query(WorkflowState).filter(
-            WorkflowState.workflow_id == board.template_id
-        ).order_by(WorkflowState.order).all()
+        by_state = AnalyticsService._aggregate_by_state([board_id], db, datetime.utcnow()).get(board_id, {})
+        return AnalyticsService._build_bottlenecks(states, by_state)
+    
+    @staticmethod
+    def _aggregate_workload(
+        board_ids: List[int],
+        final_state_ids: List[int],
+        db: Session
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Carga de trabajo por (tablero, usuario asignado) en una consulta agrupada
         
-        final_state_id = states[-1].id if states else None
+        Devuelve {board_id: [fila por usuario]} con tareas abiertas, completadas
+        esta semana, completadas en total y tiempo promedio de completado.
+        """
+        if not board_ids:
+            return {}
         
-        # Tareas por usuario
-        workload = []
+        week_ago = datetime.utcnow() - timedelta(days=7)
         
-        # Obtener usuarios únicos asignados a tareas
-        assigned_users = db.query(Task.assigned_to_id).filter(
-            Task.board_id == board_id,
-            Task.assigned_to_id.isnot(None)
-        ).distinct().all()
+        if final_state_ids:
+            is_open = Task.state_id.notin_(final_state_ids)
+            is_completed = Task.state_id.in_(final_state_ids)
+        else:
+            # Sin estados no hay tareas completadas
+            is_open = Task.state_id.isnot(None)
+            is_completed = Task.state_id.is_(None)
         
-        for (user_id,) in assigned_users:
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                continue
-            
-            # Tareas asignadas (no completadas)
-            assigned_tasks = db.query(Task).filter(
-                Task.board_id == board_id,
-                Task.assigned_to_id == user_id,
-                Task.state_id != final_state_id
-            ).count()
-            
-            # Tareas completadas esta semana
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            completed_this_week = db.query(Task).filter(
-                Task.board_id == board_id,
-                Task.assigned_to_id == user_id,
-                Task.state_id == final_state_id,
-                Task.updated_at >= week_ago
-            ).count()
-            
-            # Tiempo promedio de completado
-            completed_tasks = db.query(Task).filter(
-                Task.board_id == board_id,
-                Task.assigned_to_id == user_id,
-                Task.state_id == final_state_id
-            ).all()
-            
-            completion_times = []
-            for task in completed_tasks:
-                if task.created_at and task.updated_at:
-                    delta = task.updated_at - task.created_at
-                    completion_times.append(delta.total_seconds() / 3600)
-            
-            avg_completion = sum(completion_times) / len(completion_times) if completion_times else 0
+        completion_seconds = _epoch(Task.updated_at, db) - _epoch(Task.created_at, db)
+        
+        rows = db.query(
+            Task.board_id,
+            User.id,
+            User.username,
+            User.first_name,
+            User.last_name,
+            func.sum(case((is_open, 1), else_=0)),
+            func.sum(case((and_(is_completed, Task.updated_at >= week_ago), 1), else_=0)),
+            func.sum(case((is_completed, 1), else_=0)),
+            func.avg(case((is_completed, completion_seconds), else_=None))
+        ).join(
+            Task, Task.assigned_to_id == User.id
+        ).filter(
+            Task.board_id.in_(board_ids)
+        ).group_by(
+            Task.board_id, User.id, User.username, User.first_name, User.last_name
+        ).all()
+        
+        workload = {}
+        for board_id, user_id, username, first_name, last_name, open_count, week_count, completed_count, avg_seconds in rows:
+            workload.setdefault(board_id, []).append({
+                "user_id": user_id,
+                "username": username,
+                "full_name": f"{first_name} {last_name}",
+                "assigned_tasks": int(open_count or 0),
+                "completed_this_week": int(week_count or 0),
+                "completed_total": int(completed_count or 0),
+                "avg_completion_hours": float(avg_seconds) / 3600 if avg_seconds is not None else 0
+            })
+        
+        return workload
+    
+    @staticmethod
+    def _build_workload(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Filas de WorkloadInfo ordenadas por carga de trabajo"""
+        workload = []
+        
+        for row in rows:
+            assigned_tasks = row["assigned_tasks"]
+            avg_completion = row["avg_completion_hours"]
             
             # Determinar estado de carga
             status = "balanced"
@@ -263,11 +727,11 @@ class AnalyticsService:
                 status = "idle"
             
             workload.append({
-                "user_id": user.id,
-                "username": user.username,
-                "full_name": f"{user.first_name} {user.last_name}",
+                "user_id": row["user_id"],
+                "username": row["username"],
+                "full_name": row["full_name"],
                 "assigned_tasks": assigned_tasks,
-                "completed_this_week": completed_this_week,
+                "completed_this_week": row["completed_this_week"],
                 "avg_completion_time_hours": round(avg_completion, 1),
                 "avg_completion_time_days": round(avg_completion / 24, 1),
                 "status": status
@@ -278,82 +742,172 @@ class AnalyticsService:
         
         return workload
     
+    @staticmethod
+    def get_workload_distribution(board_id: int, db: Session) -> List[Dict[str, Any]]:
+        """Distribución de carga de trabajo por usuario"""
+        
+        board, states = AnalyticsService._get_board_states(board_id, db)
+        if not board:
+            return []
+        
+        # Una fila por usuario asignado, calculada en SQL
+        final_state_ids = [states[-1].id] if states else []
+        rows = AnalyticsService._aggregate_workload([board_id], final_state_ids, db)
+        
+        return AnalyticsService._build_workload(rows.get(board_id, []))
+    
     @staticmethod
     def get_time_in_states(board_id: int, db: Session) -> Dict[str, Dict[str, Any]]:
         """Tiempo promedio que las tareas pasan en cada estado"""
-        
-        board = db.query(Board).filter(Board.id == board_id).first()
+        board, states = AnalyticsService._get_board_states(board_id, db)
         if not board:
             return {}
         
-        states = db.query(WorkflowState).filter(
-            WorkflowState.workflow_id == board.template_id
-        ).order_by(WorkflowState.order).all()
+        now = datetime.utcnow()
+        by_state = AnalyticsService._aggregate_by_state([board_id], db, now).get(board_id, {})
+        dwell_by_state = AnalyticsService._get_dwell_by_state(board_id, db, now)
+        return AnalyticsService._build_time_in_states(states, by_state, dwell_by_state)
+    
+    @staticmethod
+    def get_flow_metrics(board_id: int, db: Session, days: int = 30) -> Dict[str, Any]:
+        """
+        Cycle time y lead time de las tareas completadas en el periodo
         
-        time_in_states = {}
+        - Lead time: desde la creación hasta la llegada al estado final
+        - Cycle time: desde el primer cambio de estado hasta la llegada al estado final
         
-        for state in states:
-            tasks_in_state = db.query(Task).filter(
-                Task.board_id == board_id,
-                Task.state_id == state.id
-            ).all()
-            
-            times = []
-            for task in tasks_in_state:
-                if task.updated_at:
-                    delta = datetime.utcnow() - task.updated_at
-                    times.append(delta.total_seconds() / 3600)
-            
-            avg_time = sum(times) / len(times) if times else 0
-            
-            time_in_states[state.name] = {
-                "avg_hours": round(avg_time, 1),
-                "avg_days": round(avg_time / 24, 1),
-                "tasks_count": len(tasks_in_state),
-                "state_order": state.order
-            }
+        Solo considera tareas en el estado final con transiciones registradas.
+        """
+        board, states = AnalyticsService._get_board_states(board_id, db)
+        if not board or not states:
+            return {}
         
-        return time_in_states
+        completed = AnalyticsService._completed_flow_times(
+            board_id, states[-1].id, datetime.utcnow() - timedelta(days=days), db
+        )
+        completed_epoch = _epoch(completed.c.completed_at, db)
+        
+        completed_count, avg_cycle, avg_lead = db.query(
+            func.count(),
+            func.avg(completed_epoch - _epoch(completed.c.started_at, db)),
+            func.avg(completed_epoch - _epoch(completed.c.created_at, db))
+        ).select_from(completed).one()
+        
+        avg_cycle = float(avg_cycle) / 3600 if avg_cycle is not None else 0
+        avg_lead = float(avg_lead) / 3600 if avg_lead is not None else 0
+        
+        return {
+            "avg_cycle_time_hours": round(avg_cycle, 1),
+            "avg_cycle_time_days": round(avg_cycle / 24, 1),
+            "avg_lead_time_hours": round(avg_lead, 1),
+            "avg_lead_time_days": round(avg_lead / 24, 1),
+            "completed_tasks": completed_count
+        }
     
     @staticmethod
-    def get_daily_trends(board_id: int, db: Session, days: int = 30) -> List[Dict[str, Any]]:
-        """Tendencia diaria de creación y completado de tareas"""
+    def _count_by_day(
+        column,
+        filters: list,
+        start_date: datetime,
+        days: int,
+        db: Session,
+        counted=None
+    ) -> Dict[int, int]:
+        """
+        Conteo de tareas por día (índice desde start_date) en una consulta agrupada
         
-        start_date = datetime.utcnow() - timedelta(days=days)
+        counted es la expresión a contar (por defecto Task.id).
+        """
+        end_date = start_date + timedelta(days=days)
+        bucket = _day_bucket(column, start_date, db)
         
-        board = db.query(Board).filter(Board.id == board_id).first()
+        rows = db.query(bucket, func.count(Task.id if counted is None else counted)).filter(
+            *filters,
+            column >= start_date,
+            column < end_date
+        ).group_by(bucket).all()
+        
+        return {int(day): count for day, count in rows if day is not None}
+    
+    @staticmethod
+    def _get_snapshots(
+        board_id: int,
+        db: Session,
+        start_day: date,
+        end_day: date
+    ) -> Dict[date, Dict[str, Any]]:
+        """Métricas de los snapshots diarios de un tablero (rango inclusive)"""
+        rows = db.query(
+            BoardAnalyticsSnapshot.snapshot_date,
+            BoardAnalyticsSnapshot.metrics
+        ).filter(
+            BoardAnalyticsSnapshot.board_id == board_id,
+            BoardAnalyticsSnapshot.snapshot_date >= start_day,
+            BoardAnalyticsSnapshot.snapshot_date <= end_day
+        ).all()
+        return {snapshot_date: metrics for snapshot_date, metrics in rows}
+    
+    @staticmethod
+    def get_daily_trends(board_id: int, db: Session, days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Tendencia diaria de creación y completado de tareas
+        
+        Días calendario (UTC) que terminan hoy. Los días cerrados se leen de
+        los snapshots diarios; solo hoy y los días sin snapshot se calculan
+        en vivo.
+        """
+        board, states = AnalyticsService._get_board_states(board_id, db)
         if not board:
             return []
         
-        states = db.query(WorkflowState).filter(
-            WorkflowState.workflow_id == board.template_id
-        ).order_by(WorkflowState.order).all()
-        
         final_state_id = states[-1].id if states else None
         
+        today = datetime.utcnow().date()
+        first_day = today - timedelta(days=days - 1)
+        snapshots = AnalyticsService._get_snapshots(
+            board_id, db, first_day, today - timedelta(days=1)
+        )
+        
+        # Calcular en vivo desde el primer día sin snapshot (como mínimo, hoy)
+        live_from = next(
+            first_day + timedelta(days=i) for i in range(days)
+            if first_day + timedelta(days=i) not in snapshots
+        )
+        live_start = datetime.combine(live_from, time.min)
+        live_days = (today - live_from).days + 1
+        
+        # Tareas creadas por día
+        created_by_day = AnalyticsService._count_by_day(
+            Task.created_at,
+            [Task.board_id == board_id],
+            live_start, live_days, db
+        )
+        
+        # Tareas que llegaron al estado final cada día (igual que los snapshots)
+        completed_by_day = AnalyticsService._count_by_day(
+            TaskStateTransition.at,
+            [TaskStateTransition.board_id == board_id, TaskStateTransition.to_state_id == final_state_id],
+            live_start, live_days, db,
+            counted=TaskStateTransition.task_id.distinct()
+        ) if final_state_id else {}
+        
+        # Rellenar los días sin actividad
         trends = []
         
         for i in range(days):
-            date = start_date + timedelta(days=i)
-            next_date = date + timedelta(days=1)
-            
-            # Tareas creadas ese día
-            created = db.query(Task).filter(
-                Task.board_id == board_id,
-                Task.created_at >= date,
-                Task.created_at < next_date
-            ).count()
+            day = first_day + timedelta(days=i)
+            snapshot = snapshots.get(day)
             
-            # Tareas completadas ese día
-            completed = db.query(Task).filter(
-                Task.board_id == board_id,
-                Task.state_id == final_state_id,
-                Task.updated_at >= date,
-                Task.updated_at < next_date
-            ).count() if final_state_id else 0
+            if snapshot is not None:
+                created = snapshot.get("daily_created", 0)
+                completed = snapshot.get("daily_completed", 0)
+            else:
+                offset = (day - live_from).days
+                created = created_by_day.get(offset, 0)
+                completed = completed_by_day.get(offset, 0)
             
             trends.append({
-                "date": date.strftime("%Y-%m-%d"),
+                "date": day.strftime("%Y-%m-%d"),
                 "created": created,
                 "completed": completed,
                 "net": created - completed
@@ -361,40 +915,215 @@ class AnalyticsService:
         
         return trends
     
+    @staticmethod
+    def get_cumulative_flow(
+        board_id: int,
+        db: Session,
+        from_day: date,
+        to_day: date
+    ) -> Dict[str, Any]:
+        """
+        Tareas por estado para cada día del rango (diagrama de flujo acumulado)
+        
+        Los días cerrados se leen de los snapshots diarios (una fila por día)
+        y hoy se calcula con una sola consulta agrupada. Los días sin
+        snapshot se devuelven como huecos (counts None, source "missing"):
+        no se completan con los conteos de otro día.
+        """
+        board, states = AnalyticsService._get_board_states(board_id, db)
+        if not board:
+            return {}
+        
+        today = datetime.utcnow().date()
+        to_day = min(to_day, today)
+        
+        snapshots = AnalyticsService._get_snapshots(
+            board_id, db, from_day, min(to_day, today - timedelta(days=1))
+        )
+        
+        def counts_from_snapshot(metrics: Dict[str, Any]) -> Dict[str, int]:
+            by_state = metrics.get("tasks_by_state", {})
+            return {state.name: by_state.get(str(state.id), 0) for state in states}
+        
+        live_counts = None
+        if to_day == today:
+            rows = db.query(Task.state_id, func.count(Task.id)).filter(
+                Task.board_id == board_id
+            ).group_by(Task.state_id).all()
+            by_state = dict(rows)
+            live_counts = {state.name: by_state.get(state.id, 0) for state in states}
+        
+        days = []
+        for i in range((to_day - from_day).days + 1):
+            day = from_day + timedelta(days=i)
+            
+            if day == today:
+                counts, source = live_counts, "live"
+            elif day in snapshots:
+                counts, source = counts_from_snapshot(snapshots[day]), "snapshot"
+            else:
+                counts, source = None, "missing"
+            
+            days.append({
+                "date": day.strftime("%Y-%m-%d"),
+                "source": source,
+                "counts": counts
+            })
+        
+        return {
+            "board_id": board_id,
+            "from_date": from_day.strftime("%Y-%m-%d"),
+            "to_date": to_day.strftime("%Y-%m-%d"),
+            "states": [
+                {"state_id": state.id, "state_name": state.name, "state_order": state.order}
+                for state in states
+            ],
+            "days": days
+        }
+    
     @staticmethod
     def get_tasks_by_state(board_id: int, db: Session, start_date: datetime = None, end_date: datetime = None) -> List[Dict[str, Any]]:
         """Obtener distribución de tareas por estado del workflow"""
-        
-        board = db.query(Board).filter(Board.id == board_id).first()
+        board, states = AnalyticsService._get_board_states(board_id, db)
         if not board:
             return []
         
-        states = db.query(WorkflowState).filter(
-            WorkflowState.workflow_id == board.template_id
-        ).order_by(WorkflowState.order).all()
+        by_state = AnalyticsService._aggregate_by_state(
+            [board_id], db, datetime.utcnow(), start_date, end_date
+        ).get(board_id, {})
+        return AnalyticsService._build_tasks_by_state(states, by_state)
+    
+    # ========================================================================
+    # ANALYTICS COMPLETO DEL TABLERO
+    # ========================================================================
+    
+    @staticmethod
+    def get_board_sections(
+        board_id: int,
+        days: int = 30,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> Dict[str, Callable[[Session], Any]]:
+        """
+        Secciones independientes del analytics de un tablero
         
-        tasks_by_state = []
+        Cada sección recibe su propia sesión, por lo que pueden ejecutarse
+        en secuencia o en paralelo; merge_board_sections arma la respuesta.
+        """
+        return {
+            # Overview, cuellos de botella, tiempo por estado y distribución
+            # por estado comparten una sola agregación por estado
+            "state_metrics": lambda db: AnalyticsService.get_state_metrics(board_id, db, start_date, end_date),
+            "productivity": lambda db: AnalyticsService.get_productivity_metrics(board_id, db, days),
+            "workload": lambda db: AnalyticsService.get_workload_distribution(board_id, db),
+            "flow": lambda db: AnalyticsService.get_flow_metrics(board_id, db, days),
+            "cycle_time": lambda db: AnalyticsService.get_cycle_time_distribution(board_id, db, days),
+            "trends": lambda db: AnalyticsService.get_daily_trends(board_id, db, min(days, 90))
+        }
+    
+    @staticmethod
+    def merge_board_sections(results: Dict[str, Any]) -> Dict[str, Any]:
+        """Combinar los resultados de las secciones en BoardAnalyticsResponse"""
+        state_metrics = results["state_metrics"]
         
-        for state in states:
-            # Query base
-            query = db.query(Task).filter(
-                Task.board_id == board_id,
-                Task.state_id == state.id
-            )
+        return {
+            "overview": state_metrics["overview"],
+            "productivity": results["productivity"],
+            "bottlenecks": state_metrics["bottlenecks"],
+            "workload": results["workload"],
+            "time_in_states": state_metrics["time_in_states"],
+            "tasks_by_state": state_metrics["tasks_by_state"],
+            "trends": {
+                "daily": results["trends"]
+            },
+            "flow": results["flow"] or None,
+            "cycle_time_percentiles": results["cycle_time"].get("percentiles"),
+            "cycle_time_histogram": results["cycle_time"].get("histogram")
+        }
+    
+    @staticmethod
+    def get_board_analytics(
+        board_id: int,
+        db: Session,
+        days: int = 30,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> Dict[str, Any]:
+        """Todas las secciones de BoardAnalyticsResponse, en secuencia sobre una sesión"""
+        sections = AnalyticsService.get_board_sections(board_id, days, start_date, end_date)
+        results = {name: section(db) for name, section in sections.items()}
+        return AnalyticsService.merge_board_sections(results)
+    
+    # ========================================================================
+    # PORTAFOLIO (VARIOS TABLEROS)
+    # ========================================================================
+    
+    @staticmethod
+    def get_portfolio(boards: List[Board], db: Session) -> Dict[str, Any]:
+        """
+        Overview y carga de trabajo de varios tableros con totales
+        
+        Usa consultas agrupadas por board_id, por lo que la cantidad de
+        consultas no crece con la cantidad de tableros.
+        """
+        board_ids = [b.id for b in boards]
+        states_by_template = AnalyticsService._get_states_by_template(
+            list({b.template_id for b in boards}), db
+        )
+        final_state_ids = [states[-1].id for states in states_by_template.values() if states]
+        
+        aggregates = AnalyticsService._aggregate_by_state(board_ids, db, datetime.utcnow())
+        workload = AnalyticsService._aggregate_workload(board_ids, final_state_ids, db)
+        
+        rows = []
+        total_overview = {"total_tasks": 0, "completed": 0, "in_progress": 0, "overdue": 0, "pending": 0}
+        users = {}
+        
+        for board in sorted(boards, key=lambda b: b.name):
+            states = states_by_template.get(board.template_id, [])
+            overview = AnalyticsService._build_overview(states, aggregates.get(board.id, {}))
+            board_workload = workload.get(board.id, [])
             
-            # Aplicar filtros de fecha si existen
-            if start_date:
-                query = query.filter(Task.created_at >= start_date)
-            if end_date:
-                query = query.filter(Task.created_at <= end_date)
+            rows.append({
+                "board_id": board.id,
+                "board_name": board.name,
+                "overview": overview,
+                "workload": AnalyticsService._build_workload(board_workload)
+            })
             
-            count = query.count()
+            for key in total_overview:
+                total_overview[key] += overview[key]
             
-            tasks_by_state.append({
-                "state_id": state.id,
-                "state_name": state.name,
-                "state_order": state.order,
-                "tasks_count": count
-            })
+            # Acumular por usuario; el promedio se pondera por tareas completadas
+            for row in board_workload:
+                user = users.setdefault(row["user_id"], {
+                    "user_id": row["user_id"],
+                    "username": row["username"],
+                    "full_name": row["full_name"],
+                    "assigned_tasks": 0,
+                    "completed_this_week": 0,
+                    "completed_total": 0,
+                    "completion_hours_sum": 0
+                })
+                user["assigned_tasks"] += row["assigned_tasks"]
+                user["completed_this_week"] += row["completed_this_week"]
+                user["completed_total"] += row["completed_total"]
+                user["completion_hours_sum"] += row["avg_completion_hours"] * row["completed_total"]
         
-        return tasks_by_state
\ No newline at end of file
+        for user in users.values():
+            completed_total = user["completed_total"]
+            user["avg_completion_hours"] = user["completion_hours_sum"] / completed_total if completed_total else 0
+        
+        total_tasks = total_overview["total_tasks"]
+        total_overview["completion_rate"] = round(
+            total_overview["completed"] / total_tasks * 100 if total_tasks > 0 else 0, 1
+        )
+        
+        return {
+            "boards": rows,
+            "totals": {
+                "boards_count": len(rows),
+                "overview": total_overview,
+                "workload": AnalyticsService._build_workload(list(users.values()))
+            }
+        }
@@ -0,0 +1,234 @@
+# app/services/benchmark.py
+import contextlib
+import io
+import json
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, engine
+from app.core.security import create_access_token
+from app.models.board import Board
+from app.models.task import Task
+from app.models.user import User
+from app.services.analytics_service import AnalyticsService
+
+DEFAULT_BASELINE_PATH = os.path.join("benchmarks", "baselines.json")
+
+
+class QueryCounter:
+    """Cuenta las sentencias ejecutadas por el engine (todas las conexiones e hilos)"""
+    
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+    
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        return self
+    
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+
+
+def _measure(case: Callable[[], Any]) -> Tuple[float, int, float]:
+    """Ejecutar un caso una vez: (latencia ms, consultas, pico de memoria KB)"""
+    tracemalloc.start()
+    try:
+        with QueryCounter() as counter, contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            case()
+            elapsed = (time.perf_counter() - started) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, counter.count, peak / 1024
+
+
+def _analytics_cases(board_id: int, board_ids: List[int]) -> Dict[str, Callable[[Session], Any]]:
+    """Métodos de AnalyticsService sobre el tablero elegido"""
+    today = datetime.utcnow().date()
+    
+    def portfolio(db: Session):
+        boards = db.query(Board).filter(Board.id.in_(board_ids)).all()
+        return AnalyticsService.get_portfolio(boards, db)
+    
+    return {
+        "analytics.state_metrics": lambda db: AnalyticsService.get_state_metrics(board_id, db),
+        "analytics.productivity": lambda db: AnalyticsService.get_productivity_metrics(board_id, db, 30),
+        "analytics.workload": lambda db: AnalyticsService.get_workload_distribution(board_id, db),
+        "analytics.flow": lambda db: AnalyticsService.get_flow_metrics(board_id, db, 30),
+        "analytics.cycle_time": lambda db: AnalyticsService.get_cycle_time_distribution(board_id, db, 30),
+        "analytics.daily_trends_90d": lambda db: AnalyticsService.get_daily_trends(board_id, db, 90),
+        "analytics.cfd_90d": lambda db: AnalyticsService.get_cumulative_flow(
+            board_id, db, today - timedelta(days=89), today
+        ),
+        "analytics.board_analytics": lambda db: AnalyticsService.get_board_analytics(board_id, db, 30),
+        "analytics.portfolio": portfolio,
+    }
+
+
+def _endpoint_cases(board_id: int, username: str) -> Dict[str, Callable[[], Any]]:
+    """
+    Endpoints más usados, llamados en proceso con TestClient
+    
+    Requiere httpx; si no está instalado se omiten.
+    """
+    try:
+        from fastapi.testclient import TestClient
+    except (ImportError, RuntimeError):
+        print("⚠️ httpx no está instalado: se omiten los endpoints")
+        return {}
+    
+    from app.main import app
+    
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+    
+    def get(path: str):
+        def call():
+            response = client.get(f"/api/v1{path}", headers=headers)
+            response.raise_for_status()
+            return response
+        return call
+    
+    return {
+        "endpoint.list_boards": get("/boards/"),
+        "endpoint.board_tasks": get(f"/boards/{board_id}/tasks"),
+        "endpoint.list_tasks_board": get(f"/tasks?board_id={board_id}"),
+        "endpoint.board_analytics": get(f"/analytics/boards/{board_id}?days=30"),
+        "endpoint.board_analytics_365d": get(f"/analytics/boards/{board_id}?days=365"),
+        "endpoint.portfolio": get("/analytics/portfolio"),
+    }
+
+
+def run_benchmarks(
+    repeat: int = 5,
+    board_id: Optional[int] = None,
+    only: Optional[List[str]] = None,
+    include_endpoints: bool = True
+) -> Dict[str, Dict[str, float]]:
+    """
+    Ejecutar la suite y devolver las métricas por caso
+    
+    Sin board_id se usa el tablero con más tareas. Cada caso corre una vez
+    de calentamiento y luego `repeat` veces; se reporta la mediana de
+    latencia, las consultas de la última corrida y el pico de memoria.
+    El cache de analytics se desactiva para medir el cálculo completo.
+    """
+    from app.services.analytics_cache import (
+        InMemoryCacheBackend,
+        analytics_cache,
+        configure_analytics_cache
+    )
+    
+    db = SessionLocal()
+    try:
+        if board_id is None:
+            board_id = db.query(Task.board_id).group_by(Task.board_id).order_by(
+                func.count(Task.id).desc()
+            ).limit(1).scalar()
+        if board_id is None:
+            raise ValueError("No hay tareas; genere datos con 'generate-data'")
+        
+        board_ids = [b_id for (b_id,) in db.query(Board.id).filter(Board.is_archived == False)]
+        admin = db.query(User).filter(User.username == "admin").first()
+    finally:
+        db.close()
+    
+    cases: Dict[str, Callable[[], Any]] = {}
+    for name, section in _analytics_cases(board_id, board_ids).items():
+        def run_section(section=section):
+            session = SessionLocal()
+            try:
+                return section(session)
+            finally:
+                session.close()
+        cases[name] = run_section
+    
+    if include_endpoints and admin:
+        cases.update(_endpoint_cases(board_id, admin.username))
+    
+    if only:
+        cases = {name: case for name, case in cases.items() if any(o in name for o in only)}
+    
+    previous_backend = analytics_cache.backend
+    configure_analytics_cache(InMemoryCacheBackend(max_entries=0))
+    
+    results = {}
+    try:
+        for name, case in cases.items():
+            _measure(case)  # calentamiento
+            runs = [_measure(case) for _ in range(repeat)]
+            latencies = [latency for latency, _, _ in runs]
+            
+            results[name] = {
+                "latency_ms": round(statistics.median(latencies), 2),
+                "min_ms": round(min(latencies), 2),
+                "max_ms": round(max(latencies), 2),
+                "queries": runs[-1][1],
+                "peak_kb": round(max(peak for _, _, peak in runs), 1)
+            }
+    finally:
+        configure_analytics_cache(previous_backend)
+    
+    return results
+
+
+def load_baselines(path: str) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Baselines guardados por dialecto: {dialecto: {caso: métricas}}"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(path: str, dialect: str, results: Dict[str, Dict[str, float]]) -> None:
+    """Guardar los resultados como baseline del dialecto actual"""
+    baselines = load_baselines(path)
+    baselines[dialect] = results
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = 0.2
+) -> Dict[str, List[str]]:
+    """
+    Regresiones por caso respecto del baseline
+    
+    Latencia y memoria admiten la tolerancia relativa indicada; la cantidad
+    de consultas debe ser igual o menor.
+    """
+    regressions = {}
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        
+        problems = []
+        if metrics["latency_ms"] > reference["latency_ms"] * (1 + tolerance):
+            problems.append("latency")
+        if metrics["queries"] > reference["queries"]:
+            problems.append("queries")
+        if metrics["peak_kb"] > reference["peak_kb"] * (1 + tolerance):
+            problems.append("memory")
+        
+        if problems:
+            regressions[name] = problems
+    return regressions
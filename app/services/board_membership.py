@@ -0,0 +1,85 @@
+# app/services/board_membership.py
+from typing import Iterable, List, Set, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.board_assignment import BoardAssignment
+from app.models.user import User
+
+
+class BoardMembershipService:
+    """Altas y bajas de usuarios en tableros en operaciones por conjunto"""
+    
+    @staticmethod
+    def split_existing_users(user_ids: Iterable[int], db: Session) -> Tuple[Set[int], List[int]]:
+        """
+        Separar ids de usuarios existentes e inexistentes con una sola consulta IN
+        
+        Returns:
+            (ids existentes, ids inexistentes ordenados)
+        """
+        requested = set(user_ids)
+        if not requested:
+            return set(), []
+        
+        existing = {
+            user_id for (user_id,) in db.query(User.id).filter(User.id.in_(requested))
+        }
+        return existing, sorted(requested - existing)
+    
+    @staticmethod
+    def add_members(board_id: int, user_ids: Iterable[int], db: Session) -> int:
+        """
+        Asignar usuarios a un tablero con un único INSERT de varias filas
+        
+        Las asignaciones existentes se ignoran (ON CONFLICT DO NOTHING sobre
+        la restricción única board_id + user_id). No hace commit.
+        
+        Returns:
+            Cantidad de asignaciones nuevas
+        """
+        rows = [{"board_id": board_id, "user_id": user_id} for user_id in sorted(set(user_ids))]
+        if not rows:
+            return 0
+        
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            dialect_insert = None
+        
+        if dialect_insert is not None:
+            statement = dialect_insert(BoardAssignment).values(rows).on_conflict_do_nothing(
+                index_elements=["board_id", "user_id"]
+            )
+            return db.execute(statement).rowcount
+        
+        # Otros motores: descartar las existentes con una consulta y luego insertar
+        existing = {
+            user_id for (user_id,) in db.query(BoardAssignment.user_id).filter(
+                BoardAssignment.board_id == board_id,
+                BoardAssignment.user_id.in_([row["user_id"] for row in rows])
+            )
+        }
+        rows = [row for row in rows if row["user_id"] not in existing]
+        if rows:
+            db.execute(insert(BoardAssignment), rows)
+        return len(rows)
+    
+    @staticmethod
+    def remove_members(board_id: int, user_ids: Iterable[int], db: Session) -> int:
+        """
+        Quitar usuarios de un tablero con un único DELETE. No hace commit.
+        
+        Returns:
+            Cantidad de asignaciones eliminadas
+        """
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return 0
+        
+        return db.query(BoardAssignment).filter(
+            BoardAssignment.board_id == board_id,
+            BoardAssignment.user_id.in_(user_ids)
+        ).delete(synchronize_session=False)
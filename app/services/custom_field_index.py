@@ -0,0 +1,114 @@
+# app/services/custom_field_index.py
+from typing import Any, Iterable, Iterator, Optional, Set, Tuple
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.task_custom_field_value import TaskCustomFieldValue
+
+# Tareas por consulta al sincronizar el índice
+SYNC_CHUNK_SIZE = 500
+
+# Largo de las columnas key / value del índice (los valores más largos no se indexan)
+MAX_INDEXED_KEY_LENGTH = 100
+MAX_INDEXED_VALUE_LENGTH = 255
+
+
+def uses_jsonb(db: Session) -> bool:
+    """En Postgres custom_fields es JSONB con índice GIN y no hace falta el índice aparte"""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def value_text(value: Any) -> Optional[str]:
+    """Texto con el que se indexa y se compara un valor (None si no es escalar)"""
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def index_entries(custom_fields: Any) -> Set[Tuple[str, str]]:
+    """Pares (campo, valor) de un custom_fields; los multiselect aportan uno por opción"""
+    entries = set()
+    if not isinstance(custom_fields, dict):
+        return entries
+    
+    for key, value in custom_fields.items():
+        if len(key) > MAX_INDEXED_KEY_LENGTH:
+            continue
+        for item in value if isinstance(value, list) else [value]:
+            text = value_text(item)
+            if text and len(text) <= MAX_INDEXED_VALUE_LENGTH:
+                entries.add((key, text))
+    return entries
+
+
+def _chunks(task_ids: Iterable[int], chunk_size: int) -> Iterator[list]:
+    task_ids = sorted(set(task_ids))
+    for start in range(0, len(task_ids), chunk_size):
+        yield task_ids[start:start + chunk_size]
+
+
+def sync_custom_field_index(db: Session, task_ids: Iterable[int], chunk_size: int = SYNC_CHUNK_SIZE) -> int:
+    """
+    Reescribir las filas de task_custom_field_values de las tareas indicadas
+    
+    Lee custom_fields de la base (una consulta por cada chunk_size tareas)
+    y reemplaza sus filas. Hace flush antes para incluir los cambios
+    pendientes de la sesión; en Postgres no hace nada. El commit queda a
+    cargo de quien llama.
+    
+    Returns:
+        Cantidad de filas escritas
+    """
+    if uses_jsonb(db):
+        return 0
+    
+    db.flush()
+    written = 0
+    
+    for chunk in _chunks(task_ids, chunk_size):
+        rows = [
+            {"task_id": task_id, "board_id": board_id, "key": key, "value": value}
+            for task_id, board_id, custom_fields in db.query(
+                Task.id, Task.board_id, Task.custom_fields
+            ).filter(Task.id.in_(chunk))
+            for key, value in index_entries(custom_fields)
+        ]
+        
+        db.execute(delete(TaskCustomFieldValue).where(TaskCustomFieldValue.task_id.in_(chunk)))
+        if rows:
+            db.execute(insert(TaskCustomFieldValue), rows)
+        written += len(rows)
+    
+    return written
+
+
+def reindex_custom_fields(db: Session, batch_size: int = SYNC_CHUNK_SIZE) -> int:
+    """
+    Regenerar task_custom_field_values para todas las tareas
+    
+    Para bases con tareas anteriores al índice. Hace commit por lote.
+    
+    Returns:
+        Cantidad de filas escritas
+    """
+    if uses_jsonb(db):
+        return 0
+    
+    db.execute(delete(TaskCustomFieldValue))
+    db.commit()
+    
+    written = 0
+    last_id = 0
+    while True:
+        task_ids = [task_id for (task_id,) in db.query(Task.id).filter(
+            Task.id > last_id
+        ).order_by(Task.id).limit(batch_size)]
+        if not task_ids:
+            break
+        written += sync_custom_field_index(db, task_ids, chunk_size=batch_size)
+        db.commit()
+        last_id = task_ids[-1]
+    
+    return written
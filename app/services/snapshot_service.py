@@ -0,0 +1,199 @@
+# app/services/snapshot_service.py
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Any
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.task import Task
+from app.models.board import Board
+from app.models.board_analytics import BoardAnalyticsSnapshot
+from app.models.task_state_transition import TaskStateTransition
+from app.services.analytics_service import AnalyticsService
+
+# Un snapshot escrito más de este tiempo después del cierre del día se marca como backfill
+BACKFILL_GRACE = timedelta(days=1)
+
+
+class SnapshotService:
+    """Materialización de snapshots diarios de métricas por tablero"""
+    
+    @staticmethod
+    def _count_by_board(filters: list, db: Session) -> Dict[int, int]:
+        """Conteo de tareas agrupado por tablero"""
+        rows = db.query(Task.board_id, func.count(Task.id)).filter(
+            *filters
+        ).group_by(Task.board_id).all()
+        return {board_id: count for board_id, count in rows}
+    
+    @staticmethod
+    def materialize_day(
+        db: Session,
+        snapshot_date: date,
+        board_ids: Optional[List[int]] = None,
+        only_missing: bool = False
+    ) -> int:
+        """
+        Escribir el snapshot de un día para cada tablero activo
+        
+        Idempotente por (board_id, snapshot_date): si el snapshot ya existe
+        se sobrescriben sus métricas (o se omite con only_missing=True).
+        Los conteos por estado son los del cierre del día, reconstruidos
+        desde task_state_transitions (solo tareas creadas hasta entonces),
+        así que un día pasado no toma la distribución actual. Las
+        completadas del día salen de las transiciones al estado final. Los
+        snapshots escritos después de BACKFILL_GRACE llevan
+        "backfilled": true (no incluyen tareas eliminadas desde entonces).
+        
+        Returns:
+            Cantidad de snapshots escritos
+        """
+        day_start = datetime.combine(snapshot_date, time.min)
+        day_end = day_start + timedelta(days=1)
+        
+        query = db.query(Board).filter(Board.is_archived == False)
+        if board_ids is not None:
+            query = query.filter(Board.id.in_(board_ids))
+        boards = query.all()
+        if not boards:
+            return 0
+        
+        ids = [b.id for b in boards]
+        
+        existing = {
+            s.board_id: s for s in db.query(BoardAnalyticsSnapshot).filter(
+                BoardAnalyticsSnapshot.board_id.in_(ids),
+                BoardAnalyticsSnapshot.snapshot_date == snapshot_date
+            ).all()
+        }
+        if only_missing:
+            boards = [b for b in boards if b.id not in existing]
+            ids = [b.id for b in boards]
+            if not boards:
+                return 0
+        
+        states_by_template = AnalyticsService._get_states_by_template(
+            list({b.template_id for b in boards}), db
+        )
+        final_state_ids = [
+            states[-1].id for states in states_by_template.values() if states
+        ]
+        
+        # Conteos por (tablero, estado) y vencidas al cierre del día
+        aggregates = AnalyticsService._aggregate_states_as_of(ids, db, day_end)
+        backfilled = datetime.utcnow() >= day_end + BACKFILL_GRACE
+        
+        # Actividad del día: creadas y completadas
+        created = SnapshotService._count_by_board([
+            Task.board_id.in_(ids),
+            Task.created_at >= day_start,
+            Task.created_at < day_end
+        ], db)
+        completed = dict(db.query(
+            TaskStateTransition.board_id,
+            func.count(TaskStateTransition.task_id.distinct())
+        ).filter(
+            TaskStateTransition.board_id.in_(ids),
+            TaskStateTransition.to_state_id.in_(final_state_ids),
+            TaskStateTransition.at >= day_start,
+            TaskStateTransition.at < day_end
+        ).group_by(TaskStateTransition.board_id).all()) if final_state_ids else {}
+        
+        for board in boards:
+            states = states_by_template.get(board.template_id, [])
+            by_state = aggregates.get(board.id, {})
+            overview = AnalyticsService._build_overview(states, by_state)
+            
+            metrics = {
+                "total_tasks": overview["total_tasks"],
+                "tasks_by_state": {
+                    str(state.id): by_state.get(state.id, {}).get("tasks_count", 0)
+                    for state in states
+                },
+                "wip": overview["in_progress"],
+                "completed": overview["completed"],
+                "pending": overview["pending"],
+                "overdue": overview["overdue"],
+                "daily_created": created.get(board.id, 0),
+                "daily_completed": completed.get(board.id, 0),
+                "backfilled": backfilled
+            }
+            
+            snapshot = existing.get(board.id)
+            if snapshot:
+                snapshot.metrics = metrics
+            else:
+                db.add(BoardAnalyticsSnapshot(
+                    board_id=board.id,
+                    snapshot_date=snapshot_date,
+                    metrics=metrics
+                ))
+        
+        db.commit()
+        return len(boards)
+
+
+# ============================================================================
+# PROGRAMACIÓN EN PROCESO
+# ============================================================================
+
+class SnapshotScheduler:
+    """
+    Hilo en segundo plano que materializa el snapshot del día anterior
+    
+    Se ejecuta una vez al día a la hora UTC configurada. Al arrancar
+    completa el día anterior si todavía no tiene snapshot.
+    """
+    
+    def __init__(self, run_at: time = time(0, 5)):
+        self.run_at = run_at
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-scheduler", daemon=True)
+        self._thread.start()
+        print(f"📸 Scheduler de snapshots iniciado (diario a las {self.run_at.strftime('%H:%M')} UTC)")
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _seconds_until_next_run(self) -> float:
+        now = datetime.utcnow()
+        next_run = datetime.combine(now.date(), self.run_at)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+    
+    def _materialize_yesterday(self, only_missing: bool):
+        yesterday = datetime.utcnow().date() - timedelta(days=1)
+        db = SessionLocal()
+        try:
+            written = SnapshotService.materialize_day(db, yesterday, only_missing=only_missing)
+            print(f"📸 Snapshots {yesterday}: {written} tableros")
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Error materializando snapshots {yesterday}: {e}")
+        finally:
+            db.close()
+    
+    def _run(self):
+        self._materialize_yesterday(only_missing=True)
+        while not self._stop.wait(self._seconds_until_next_run()):
+            self._materialize_yesterday(only_missing=False)
+
+
+def _scheduler_run_at() -> time:
+    """Hora UTC de ejecución configurada en ANALYTICS_SNAPSHOT_TIME (HH:MM)"""
+    value = os.getenv("ANALYTICS_SNAPSHOT_TIME", "00:05")
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except ValueError:
+        return time(0, 5)
+
+
+snapshot_scheduler = SnapshotScheduler(run_at=_scheduler_run_at())
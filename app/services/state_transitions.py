@@ -0,0 +1,147 @@
+# app/services/state_transitions.py
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Dict, List, Optional, Any
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.board import Board
+from app.models.user import User
+from app.models.workflow import WorkflowState
+from app.models.task_state_transition import TaskStateTransition
+from app.models.task_event import TaskEvent
+
+# Diferencia máxima entre el evento de un cambio de estado y su transición
+# (se registran en el mismo request, el evento primero)
+LIVE_EVENT_SKEW = timedelta(seconds=1)
+
+
+def record_state_transition(
+    db: Session,
+    task: Task,
+    from_state_id: Optional[int],
+    to_state_id: int,
+    actor: Optional[User]
+) -> TaskStateTransition:
+    """
+    Registrar un cambio de estado de una tarea
+    
+    Se agrega a la sesión; el commit queda a cargo de quien llama.
+    """
+    transition = TaskStateTransition(
+        task_id=task.id,
+        board_id=task.board_id,
+        from_state_id=from_state_id,
+        to_state_id=to_state_id,
+        at=datetime.utcnow(),
+        actor_id=actor.id if actor else None
+    )
+    db.add(transition)
+    return transition
+
+
+def parse_record_timestamp(entry: Dict[str, Any]) -> Optional[datetime]:
+    """
+    Momento (UTC naive) de una entrada de Task.record
+    
+    Las entradas guardan fecha "DD/MM/AAAA" y hora "HH:MM:SS" en hora
+    local del servidor.
+    """
+    try:
+        local = datetime.strptime(f"{entry['fecha']} {entry['hora']}", "%d/%m/%Y %H:%M:%S")
+    except (KeyError, TypeError, ValueError):
+        return None
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def transitions_from_record(
+    record: List[Dict[str, Any]],
+    state_ids: Dict[str, int],
+    user_ids: Dict[str, int]
+) -> List[Dict[str, Any]]:
+    """
+    Reconstruir los cambios de estado a partir del historial de una tarea
+    
+    Hay un cambio cada vez que el estado de una entrada difiere del de la
+    entrada anterior. Cada entrada trae su momento en "at" o, en el
+    formato anterior de Task.record, en "fecha" y "hora". Las entradas con
+    estado desconocido o sin fecha válida se ignoran.
+    """
+    transitions = []
+    previous_state_id = None
+    
+    for entry in record or []:
+        if not isinstance(entry, dict):
+            continue
+        
+        state_id = state_ids.get(entry.get("status"))
+        if state_id is None:
+            continue
+        
+        if previous_state_id is not None and state_id != previous_state_id:
+            at = entry.get("at") or parse_record_timestamp(entry)
+            if at is not None:
+                transitions.append({
+                    "from_state_id": previous_state_id,
+                    "to_state_id": state_id,
+                    "at": at,
+                    "actor_id": user_ids.get(entry.get("user"))
+                })
+        
+        previous_state_id = state_id
+    
+    return transitions
+
+
+def backfill_state_transitions(db: Session, batch_size: int = 1000) -> int:
+    """
+    Poblar task_state_transitions a partir de los historiales existentes
+    
+    Recorre task_events en orden (tarea, id). En las tareas que ya tienen
+    transiciones solo agrega las anteriores a la primera registrada (menos
+    LIVE_EVENT_SKEW): las posteriores ya se registraron al cambiar de
+    estado. Así completa el tramo previo sin duplicar, y puede ejecutarse
+    más de una vez.
+    
+    Returns:
+        Cantidad de transiciones insertadas
+    """
+    # Tablas de búsqueda construidas una sola vez
+    user_ids = {username: user_id for user_id, username in db.query(User.id, User.username)}
+    
+    states_by_template: Dict[int, Dict[str, int]] = {}
+    for state in db.query(WorkflowState):
+        states_by_template.setdefault(state.workflow_id, {})[state.name] = state.id
+    
+    template_by_board = {board_id: template_id for board_id, template_id in db.query(Board.id, Board.template_id)}
+    
+    first_recorded = dict(db.query(
+        TaskStateTransition.task_id, func.min(TaskStateTransition.at)
+    ).group_by(TaskStateTransition.task_id))
+    
+    inserted = 0
+    pending = []
+    
+    events = db.query(
+        TaskEvent.task_id, Task.board_id, TaskEvent.at, TaskEvent.username, TaskEvent.status
+    ).join(Task, Task.id == TaskEvent.task_id).order_by(TaskEvent.task_id, TaskEvent.id).yield_per(batch_size)
+    
+    for (task_id, board_id), rows in groupby(events, key=lambda row: (row.task_id, row.board_id)):
+        history = [{"at": row.at, "user": row.username, "status": row.status} for row in rows]
+        state_ids = states_by_template.get(template_by_board.get(board_id), {})
+        cutoff = first_recorded.get(task_id)
+        for transition in transitions_from_record(history, state_ids, user_ids):
+            if cutoff is None or transition["at"] < cutoff - LIVE_EVENT_SKEW:
+                pending.append({"task_id": task_id, "board_id": board_id, **transition})
+        
+        if len(pending) >= batch_size:
+            db.execute(insert(TaskStateTransition), pending)
+            inserted += len(pending)
+            pending = []
+    
+    if pending:
+        db.execute(insert(TaskStateTransition), pending)
+        inserted += len(pending)
+    
+    db.commit()
+    return inserted
@@ -0,0 +1,245 @@
+# app/services/synthetic_data.py
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Any
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.security import hash_password
+from app.models.roles import Role
+from app.models.user import User
+from app.models.board import Board
+from app.models.board_assignment import BoardAssignment
+from app.models.workflow import WorkflowTemplate, WorkflowState
+from app.models.task import Task
+from app.models.task_state_transition import TaskStateTransition
+from app.models.task_event import TaskEvent
+from app.services.task_search import refresh_search_documents
+
+# Prefijo de los usuarios generados; permite detectar un dataset existente
+SYNTHETIC_PREFIX = "synth_"
+
+COMMENTS = [
+    "Revisado con el equipo",
+    "Se agregan detalles del requerimiento",
+    "Pendiente de respuesta del cliente",
+    "Bloqueado por dependencia externa",
+    "Se actualiza la estimación",
+    "Listo para la siguiente etapa",
+]
+
+
+def _event(at: datetime, username: str, status: str, doc: str) -> Dict[str, Any]:
+    """Entrada de historial (fila de task_events sin task_id ni user_id)"""
+    return {"at": at, "username": username, "status": status, "doc": doc}
+
+
+def _task_history(
+    rng: random.Random,
+    states: List[WorkflowState],
+    created_at: datetime,
+    now: datetime,
+    usernames: List[str]
+):
+    """
+    Recorrido de una tarea por su workflow
+    
+    Avanza estado por estado con permanencias exponenciales, con retrocesos
+    ocasionales y comentarios intermedios, sin pasar del momento actual.
+    
+    Returns:
+        (estado actual, última actualización, historial, transiciones)
+    """
+    author = rng.choice(usernames)
+    events = [_event(created_at, author, states[0].name, f"Tarea creada por {author}")]
+    transitions = []
+    
+    position = 0
+    at = created_at
+    target = rng.choices(range(len(states)), weights=range(len(states), 0, -1))[0]
+    target = max(target, rng.randint(0, len(states) - 1))
+    
+    while position < target:
+        # Las etapas intermedias tienden a demorar más que la inicial
+        at = at + timedelta(hours=rng.expovariate(1 / (12 + 24 * position)))
+        if at >= now:
+            break
+        
+        if rng.random() < 0.25:
+            events.append(_event(at, rng.choice(usernames), states[position].name, rng.choice(COMMENTS)))
+        
+        step = -1 if position > 0 and rng.random() < 0.1 else 1
+        user = rng.choice(usernames)
+        previous = states[position]
+        position += step
+        
+        events.append(_event(
+            at, user, states[position].name,
+            f"Estado cambiado de '{previous.name}' a '{states[position].name}'"
+        ))
+        transitions.append({
+            "from_state_id": previous.id,
+            "to_state_id": states[position].id,
+            "at": at,
+            "user": user
+        })
+    
+    return states[position], at, events, transitions
+
+
+def generate_synthetic_dataset(
+    db: Session,
+    boards: int = 20,
+    users: int = 50,
+    tasks: int = 100_000,
+    days: int = 365,
+    seed: int = 42,
+    batch_size: int = 5000
+) -> Dict[str, int]:
+    """
+    Generar un dataset sintético determinista para benchmarks
+    
+    Usa los workflows sembrados por seed. Las tareas se reparten entre
+    tableros con una distribución sesgada (pocos tableros grandes) y se
+    insertan por lotes junto con sus transiciones de estado e historial.
+    
+    Returns:
+        Cantidad de filas creadas por tipo
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    
+    if db.query(User).filter(User.username.like(f"{SYNTHETIC_PREFIX}%")).first():
+        raise ValueError("Ya existe un dataset sintético en esta base de datos")
+    
+    templates = db.query(WorkflowTemplate).order_by(WorkflowTemplate.id).all()
+    states_by_template = {}
+    for state in db.query(WorkflowState).order_by(WorkflowState.workflow_id, WorkflowState.order):
+        states_by_template.setdefault(state.workflow_id, []).append(state)
+    templates = [t for t in templates if len(states_by_template.get(t.id, [])) >= 2]
+    if not templates:
+        raise ValueError("No hay workflows sembrados; ejecute 'seed' primero")
+    
+    agent_role = db.query(Role).filter(Role.name == "Agente").first()
+    
+    # USUARIOS (una sola contraseña hasheada para todos)
+    password = hash_password("synthetic123")
+    user_rows = [
+        User(
+            username=f"{SYNTHETIC_PREFIX}{i:04d}",
+            first_name=f"Usuario{i}",
+            last_name="Sintético",
+            email=f"{SYNTHETIC_PREFIX}{i:04d}@example.com",
+            password=password,
+            role_id=agent_role.id if agent_role else None
+        )
+        for i in range(users)
+    ]
+    db.add_all(user_rows)
+    db.flush()
+    user_ids = {u.username: u.id for u in user_rows}
+    
+    # TABLEROS Y ASIGNACIONES
+    board_rows = []
+    members_by_board = {}
+    for i in range(boards):
+        template = templates[i % len(templates)]
+        members = rng.sample(user_rows, k=min(len(user_rows), rng.randint(3, 12)))
+        board = Board(
+            name=f"Tablero sintético {i + 1}",
+            description="Generado para benchmarks",
+            template_id=template.id,
+            owner_id=members[0].id
+        )
+        db.add(board)
+        board_rows.append(board)
+        members_by_board[i] = members
+    db.flush()
+    
+    assignments = [
+        {"board_id": board.id, "user_id": member.id}
+        for i, board in enumerate(board_rows)
+        for member in members_by_board[i]
+    ]
+    db.execute(insert(BoardAssignment), assignments)
+    db.commit()
+    
+    # TAREAS: pocos tableros concentran la mayoría (tipo Zipf)
+    weights = [1 / (i + 1) for i in range(len(board_rows))]
+    created_tasks = 0
+    created_transitions = 0
+    created_events = 0
+    
+    while created_tasks < tasks:
+        task_rows = []
+        pending_transitions = []
+        pending_events = []
+        
+        for n in range(created_tasks, min(created_tasks + batch_size, tasks)):
+            index = rng.choices(range(len(board_rows)), weights=weights)[0]
+            board = board_rows[index]
+            members = members_by_board[index]
+            usernames = [m.username for m in members]
+            states = states_by_template[board.template_id]
+            
+            created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+            state, updated_at, events, transitions = _task_history(rng, states, created_at, now, usernames)
+            assignee = rng.choice(members) if rng.random() < 0.8 else None
+            
+            task_rows.append({
+                "title": f"Tarea sintética {n + 1}",
+                "description": f"Descripción de la tarea sintética {n + 1}",
+                "board_id": board.id,
+                "state_id": state.id,
+                "assigned_to_id": assignee.id if assignee else None,
+                "created_by_id": user_ids[usernames[0]],
+                "start_date": created_at,
+                "end_date": created_at + timedelta(days=rng.randint(1, 45)),
+                "custom_fields": {},
+                "created_at": created_at,
+                "updated_at": updated_at
+            })
+            pending_transitions.append((board.id, transitions))
+            pending_events.append(events)
+        
+        task_ids = db.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True),
+            task_rows
+        ).all()
+        
+        transition_rows = [
+            {
+                "task_id": task_id,
+                "board_id": board_id,
+                "from_state_id": t["from_state_id"],
+                "to_state_id": t["to_state_id"],
+                "at": t["at"],
+                "actor_id": user_ids[t["user"]]
+            }
+            for task_id, (board_id, transitions) in zip(task_ids, pending_transitions)
+            for t in transitions
+        ]
+        if transition_rows:
+            db.execute(insert(TaskStateTransition), transition_rows)
+        
+        event_rows = [
+            {"task_id": task_id, "user_id": user_ids[e["username"]], **e}
+            for task_id, events in zip(task_ids, pending_events)
+            for e in events
+        ]
+        db.execute(insert(TaskEvent), event_rows)
+        refresh_search_documents(db, task_ids)
+        
+        db.commit()
+        created_tasks += len(task_rows)
+        created_transitions += len(transition_rows)
+        created_events += len(event_rows)
+        print(f"  ✓ {created_tasks}/{tasks} tareas")
+    
+    return {
+        "users": len(user_rows),
+        "boards": len(board_rows),
+        "board_assignments": len(assignments),
+        "tasks": created_tasks,
+        "transitions": created_transitions,
+        "task_events": created_events
+    }
@@ -0,0 +1,22 @@
+# app/services/task_deletion.py
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from app.models.task_custom_field_value import TaskCustomFieldValue
+from app.models.task_search import TaskSearchDocument
+from app.models.task_state_transition import TaskStateTransition
+
+
+def delete_task_dependents(db: Session, task_ids) -> None:
+    """
+    Borrar las filas derivadas de las tareas indicadas (ids o subconsulta)
+    
+    Sus FK tienen ON DELETE CASCADE, pero SQLite no aplica las FK por
+    defecto: sin esto quedan huérfanas y, como SQLite reutiliza el id más
+    alto, se le atribuirían a la próxima tarea creada. Cubre el índice de
+    campos personalizados, los documentos de búsqueda y las transiciones
+    de estado (los eventos se borran por la relación Task.events). El
+    commit queda a cargo de quien llama.
+    """
+    db.execute(delete(TaskCustomFieldValue).where(TaskCustomFieldValue.task_id.in_(task_ids)))
+    db.execute(delete(TaskSearchDocument).where(TaskSearchDocument.task_id.in_(task_ids)))
+    db.execute(delete(TaskStateTransition).where(TaskStateTransition.task_id.in_(task_ids)))
@@ -0,0 +1,148 @@
+# app/services/task_events.py
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.task import Task
+from app.models.task_event import TaskEvent
+from app.models.user import User
+from app.services.state_transitions import parse_record_timestamp
+from app.services.task_search import append_search_text
+
+
+def event_values(
+    task_id: int,
+    user: Optional[User],
+    status: Optional[str],
+    doc: str,
+    at: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Valores de una fila de task_events (para add o para inserciones masivas)"""
+    return {
+        "task_id": task_id,
+        "at": at or datetime.utcnow(),
+        "user_id": user.id if user else None,
+        "username": user.username if user else "",
+        "status": status,
+        "doc": doc
+    }
+
+
+def creation_event_values(task_id: int, user: User, state_name: str) -> Dict[str, Any]:
+    """Entrada inicial del historial de una tarea nueva ('Tarea creada por ...')"""
+    return event_values(task_id, user, state_name, f"Tarea creada por {user.username}")
+
+
+def add_task_event(db: Session, task: Task, user: User, status: Optional[str], doc: str) -> TaskEvent:
+    """
+    Agregar una entrada al historial de la tarea
+    
+    Inserta una fila en task_events sin leer ni reescribir el historial
+    existente. También actualiza updated_at de la tarea, que usan el ETag
+    del listado y las métricas, y agrega el texto a su documento de
+    búsqueda. El commit queda a cargo de quien llama.
+    """
+    event = TaskEvent(**event_values(task.id, user, status, doc))
+    db.add(event)
+    task.updated_at = datetime.utcnow()
+    append_search_text(db, task.id, doc)
+    return event
+
+
+def load_recent_events(db: Session, tasks: List[Task], limit: int, chunk_size: int = 500) -> None:
+    """
+    Cargar en Task.events solo los últimos `limit` eventos de cada tarea
+    
+    Una consulta con row_number() por cada chunk_size tareas; el resultado
+    queda como colección ya cargada, así que TaskOut.record no dispara
+    lazy loads.
+    """
+    recent: Dict[int, List[TaskEvent]] = {}
+    task_ids = [task.id for task in tasks]
+    
+    for start in range(0, len(task_ids) if limit > 0 else 0, chunk_size):
+        position = func.row_number().over(
+            partition_by=TaskEvent.task_id,
+            order_by=TaskEvent.id.desc()
+        ).label("position")
+        ranked = select(TaskEvent.id, position).where(
+            TaskEvent.task_id.in_(task_ids[start:start + chunk_size])
+        ).subquery()
+        
+        events = db.query(TaskEvent).join(ranked, TaskEvent.id == ranked.c.id).filter(
+            ranked.c.position <= limit
+        ).order_by(TaskEvent.task_id, TaskEvent.id)
+        for event in events:
+            recent.setdefault(event.task_id, []).append(event)
+    
+    for task in tasks:
+        set_committed_value(task, "events", recent.get(task.id, []))
+
+
+def backfill_task_events(db: Session, batch_size: int = 1000) -> int:
+    """
+    Copiar a task_events los historiales guardados en el JSON de Task.record
+    
+    Copia solo las entradas que faltan: en las tareas que ya tienen
+    eventos (una copia anterior o entradas agregadas después de la
+    migración) se omiten las que ya existen con el mismo momento, usuario,
+    estado y texto. Puede ejecutarse más de una vez. Las entradas sin
+    fecha válida toman la fecha de creación de la tarea.
+    
+    Returns:
+        Cantidad de eventos insertados
+    """
+    user_ids = {username: user_id for user_id, username in db.query(User.id, User.username)}
+    with_events = {task_id for (task_id,) in db.query(TaskEvent.task_id).distinct()}
+    
+    inserted = 0
+    last_id = 0
+    
+    while True:
+        tasks = db.query(Task.id, Task.created_at, Task.legacy_record).filter(
+            Task.id > last_id,
+            Task.legacy_record.isnot(None)
+        ).order_by(Task.id).limit(batch_size).all()
+        if not tasks:
+            break
+        last_id = tasks[-1].id
+        
+        # Eventos ya copiados (o agregados después) de las tareas del lote
+        existing: Dict[int, Counter] = {}
+        for row in db.query(
+            TaskEvent.task_id, TaskEvent.at, TaskEvent.username, TaskEvent.status, TaskEvent.doc
+        ).filter(TaskEvent.task_id.in_([t.id for t in tasks if t.id in with_events])):
+            existing.setdefault(row.task_id, Counter())[tuple(row[1:])] += 1
+        
+        pending = []
+        for task_id, created_at, record in tasks:
+            if not isinstance(record, list):
+                continue
+            
+            copied = existing.get(task_id, Counter())
+            for entry in record:
+                if not isinstance(entry, dict):
+                    continue
+                username = str(entry.get("user") or "")[:50]
+                at = parse_record_timestamp(entry) or created_at
+                key = (at, username, entry.get("status"), entry.get("doc"))
+                if copied[key] > 0:
+                    copied[key] -= 1
+                    continue
+                pending.append({
+                    "task_id": task_id,
+                    "at": at,
+                    "user_id": user_ids.get(username),
+                    "username": username,
+                    "status": entry.get("status"),
+                    "doc": entry.get("doc")
+                })
+        
+        if pending:
+            db.execute(insert(TaskEvent), pending)
+            inserted += len(pending)
+        db.commit()
+    
+    return inserted
@@ -0,0 +1,352 @@
+# app/services/task_import.py
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.board import Board
+from app.models.task import Task
+from app.models.task_event import TaskEvent
+from app.models.task_state_transition import TaskStateTransition
+from app.models.user import User
+from app.models.workflow import WorkflowState, WorkflowTemplate
+from app.services.analytics_cache import analytics_cache
+from app.services.task_events import creation_event_values
+from app.services.task_search import refresh_search_documents
+from app.services.custom_field_index import sync_custom_field_index
+
+IMPORT_FORMATS = ("jsonl", "csv")
+
+# Errores por fila que se devuelven en el reporte (el resto solo se cuenta)
+MAX_REPORTED_ERRORS = 500
+
+TITLE_MAX_LENGTH = 200
+
+
+class RowError(ValueError):
+    """Error de validación de una fila del archivo"""
+
+
+def _valid_input(value: Any, kind: str) -> bool:
+    """Si un valor corresponde al tipo de un campo input (txt, num, txtnum, none)"""
+    if isinstance(value, bool):
+        return kind == "none"
+    if kind == "txt":
+        return isinstance(value, str)
+    if kind == "num":
+        if isinstance(value, (int, float)):
+            return True
+        try:
+            float(value)
+            return True
+        except (TypeError, ValueError):
+            return False
+    if kind == "txtnum":
+        return isinstance(value, (str, int, float))
+    return True
+
+
+def validate_custom_fields(custom_fields: Dict[str, Any], fields_config: Optional[Dict[str, Any]]) -> None:
+    """
+    Validar campos personalizados contra la configuración del workflow
+    
+    Usa el formato de taskConfig.json: select acepta un valor de 'val',
+    multiselect una lista de valores de 'val' e input el tipo indicado.
+    Los campos sin tipo o con un tipo desconocido se tratan como entrada
+    libre. Sin configuración para el workflow se acepta cualquier objeto.
+    """
+    if not isinstance(custom_fields, dict):
+        raise RowError("custom_fields debe ser un objeto")
+    if fields_config is None:
+        return
+    
+    for key, value in custom_fields.items():
+        if key not in fields_config:
+            raise RowError(f"Campo personalizado desconocido '{key}'")
+        if value is None or value == "" or value == []:
+            continue
+        
+        field = fields_config[key] if isinstance(fields_config[key], dict) else {}
+        kind = field.get("type")
+        options = [str(o) for o in field.get("val", [])] if isinstance(field.get("val"), list) else []
+        
+        if kind == "select":
+            if str(value) not in options:
+                raise RowError(f"Valor inválido '{value}' para '{key}' (opciones: {options})")
+        elif kind == "multiselect":
+            if not isinstance(value, list):
+                raise RowError(f"'{key}' debe ser una lista")
+            invalid = [v for v in value if str(v) not in options]
+            if invalid:
+                raise RowError(f"Valores inválidos {invalid} para '{key}' (opciones: {options})")
+        elif kind == "input":
+            if not _valid_input(value, field.get("val")):
+                raise RowError(f"Valor inválido '{value}' para '{key}' (tipo {field.get('val')})")
+
+
+def detect_format(filename: Optional[str], file_format: Optional[str] = None) -> str:
+    """Formato explícito o deducido de la extensión del archivo"""
+    if file_format:
+        file_format = file_format.lower()
+    elif filename and filename.lower().endswith(".csv"):
+        file_format = "csv"
+    elif filename and filename.lower().endswith((".jsonl", ".ndjson", ".json")):
+        file_format = "jsonl"
+    
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError(f"Formato no soportado (use uno de: {', '.join(IMPORT_FORMATS)})")
+    return file_format
+
+
+def iter_rows(stream: io.TextIOBase, file_format: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Filas del archivo a medida que se leen: (número de línea, fila)
+    
+    Una línea JSON inválida se entrega como RowError para reportarla sin
+    cortar la importación. En CSV la columna custom_fields es un objeto JSON.
+    """
+    if file_format == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, RowError(f"JSON inválido: {e.msg}")
+        return
+    
+    reader = csv.DictReader(stream)
+    for row in reader:
+        row = {k: v for k, v in row.items() if k is not None and v not in (None, "")}
+        if "custom_fields" in row:
+            try:
+                row["custom_fields"] = json.loads(row["custom_fields"])
+            except json.JSONDecodeError:
+                yield reader.line_num, RowError("custom_fields no es un JSON válido")
+                continue
+        yield reader.line_num, row
+
+
+def _parse_datetime(row: Dict[str, Any], key: str) -> Optional[datetime]:
+    value = row.get(key)
+    if value in (None, ""):
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise RowError(f"Fecha inválida en '{key}' (use ISO 8601)")
+
+
+class _ImportLookups:
+    """Tablas en memoria para resolver estados y usuarios sin consultas por fila"""
+    
+    def __init__(self, board: Board, db: Session):
+        states = db.query(WorkflowState).filter(
+            WorkflowState.workflow_id == board.template_id
+        ).order_by(WorkflowState.order).all()
+        self.states_by_id = {s.id: s for s in states}
+        self.states_by_name = {s.name.strip().lower(): s for s in states}
+        self.initial_state = states[0] if states else None
+        
+        self.user_ids = {username: user_id for user_id, username in db.query(User.id, User.username)}
+        self.known_user_ids = set(self.user_ids.values())
+    
+    def resolve_state(self, row: Dict[str, Any]) -> WorkflowState:
+        if row.get("state_id") not in (None, ""):
+            try:
+                state = self.states_by_id.get(int(row["state_id"]))
+            except (TypeError, ValueError):
+                state = None
+            if not state:
+                raise RowError("El estado no pertenece a la plantilla del tablero")
+            return state
+        if row.get("state"):
+            state = self.states_by_name.get(str(row["state"]).strip().lower())
+            if not state:
+                raise RowError(f"Estado '{row['state']}' no existe en la plantilla del tablero")
+            return state
+        if not self.initial_state:
+            raise RowError("La plantilla del tablero no tiene estados")
+        return self.initial_state
+    
+    def resolve_assignee(self, row: Dict[str, Any]) -> Optional[int]:
+        if row.get("assigned_to_id") not in (None, ""):
+            try:
+                user_id = int(row["assigned_to_id"])
+            except (TypeError, ValueError):
+                user_id = None
+            if user_id not in self.known_user_ids:
+                raise RowError(f"El usuario con ID {row['assigned_to_id']} no existe")
+            return user_id
+        if row.get("assignee"):
+            user_id = self.user_ids.get(str(row["assignee"]).strip())
+            if user_id is None:
+                raise RowError(f"El usuario '{row['assignee']}' no existe")
+            return user_id
+        return None
+
+
+def _build_task_row(
+    row: Any,
+    board: Board,
+    user: User,
+    lookups: _ImportLookups,
+    fields_config: Optional[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], str]:
+    """Valores de inserción de una fila y nombre de su estado (RowError si no es válida)"""
+    if isinstance(row, RowError):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError("Cada fila debe ser un objeto")
+    
+    title = str(row.get("title") or "").strip()
+    if not title:
+        raise RowError("El título es obligatorio")
+    if len(title) > TITLE_MAX_LENGTH:
+        raise RowError(f"El título supera los {TITLE_MAX_LENGTH} caracteres")
+    
+    state = lookups.resolve_state(row)
+    assigned_to_id = lookups.resolve_assignee(row)
+    
+    start_date = _parse_datetime(row, "start_date")
+    end_date = _parse_datetime(row, "end_date")
+    if start_date and end_date and end_date < start_date:
+        raise RowError("end_date debe ser posterior o igual a start_date")
+    
+    custom_fields = row.get("custom_fields") or {}
+    validate_custom_fields(custom_fields, fields_config)
+    
+    values = {
+        "title": title,
+        "description": row.get("description"),
+        "board_id": board.id,
+        "state_id": state.id,
+        "assigned_to_id": assigned_to_id,
+        "created_by_id": user.id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "custom_fields": custom_fields
+    }
+    
+    # Tickets migrados pueden conservar su fecha de creación original
+    created_at = _parse_datetime(row, "created_at")
+    if created_at:
+        values["created_at"] = created_at
+        values["updated_at"] = created_at
+    
+    return values, state.name
+
+
+def import_tasks(
+    db: Session,
+    board: Board,
+    user: User,
+    stream: io.TextIOBase,
+    file_format: str,
+    fields_config: Optional[Dict[str, Any]] = None,
+    batch_size: int = 1000,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Importar tareas a un tablero leyendo el archivo como stream
+    
+    Columnas: title (obligatoria), description, state (nombre) o state_id,
+    assignee (username) o assigned_to_id, start_date, end_date, created_at
+    y custom_fields. Las filas inválidas se saltan y se reportan con su
+    número de línea; las válidas se insertan por lotes con un INSERT de
+    varias filas, junto con la entrada inicial del historial de cada
+    tarea (y su transición si no entra en el estado inicial), y un commit
+    por lote. Con dry_run solo se valida y
+    'created' indica cuántas filas se hubieran creado.
+    
+    Returns:
+        Reporte con filas leídas, creadas, fallidas y errores por línea
+    """
+    lookups = _ImportLookups(board, db)
+    
+    total_rows = 0
+    created = 0
+    failed = 0
+    errors = []
+    pending = []
+    state_names = []
+    
+    def flush():
+        nonlocal created
+        if pending and not dry_run:
+            now = datetime.utcnow()
+            for values in pending:
+                values.setdefault("created_at", now)
+                values.setdefault("updated_at", now)
+            
+            # render_nulls: los None no parten el lote en grupos de columnas distintas
+            task_ids = db.scalars(
+                insert(Task).returning(Task.id, sort_by_parameter_order=True),
+                pending,
+                execution_options={"render_nulls": True}
+            ).all()
+            db.execute(insert(TaskEvent), [
+                creation_event_values(task_id, user, state_name)
+                for task_id, state_name in zip(task_ids, state_names)
+            ])
+            
+            # Las tareas que no entran en el estado inicial llegaron a su estado al crearse
+            transitions = [
+                {
+                    "task_id": task_id,
+                    "board_id": board.id,
+                    "from_state_id": lookups.initial_state.id,
+                    "to_state_id": values["state_id"],
+                    "at": values["created_at"],
+                    "actor_id": user.id
+                }
+                for task_id, values in zip(task_ids, pending)
+                if values["state_id"] != lookups.initial_state.id
+            ]
+            if transitions:
+                db.execute(insert(TaskStateTransition), transitions)
+            refresh_search_documents(db, task_ids)
+            sync_custom_field_index(db, task_ids)
+            db.commit()
+        created += len(pending)
+        pending.clear()
+        state_names.clear()
+    
+    for line_number, row in iter_rows(stream, file_format):
+        total_rows += 1
+        try:
+            values, state_name = _build_task_row(row, board, user, lookups, fields_config)
+        except RowError as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_number, "error": str(e)})
+            continue
+        
+        pending.append(values)
+        state_names.append(state_name)
+        if len(pending) >= batch_size:
+            flush()
+    
+    flush()
+    
+    if created and not dry_run:
+        analytics_cache.invalidate_board(board.id)
+    
+    return {
+        "total_rows": total_rows,
+        "created": created,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+        "dry_run": dry_run
+    }
+
+
+def workflow_fields_config(board: Board, db: Session, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Configuración de campos del workflow del tablero (None si no tiene)"""
+    template_name = db.query(WorkflowTemplate.name).filter(
+        WorkflowTemplate.id == board.template_id
+    ).scalar()
+    return config.get(template_name)
@@ -0,0 +1,207 @@
+# app/services/task_search.py
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import cast, column, delete, func, insert, literal_column, or_, select, table, text, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+from app.core.permissions import PermissionChecker
+from app.models.task import Task
+from app.models.task_event import TaskEvent
+from app.models.task_search import SEARCH_CONFIG, TaskSearchDocument, create_sqlite_search_index
+from app.models.user import User
+
+# Tareas por consulta al regenerar documentos
+REFRESH_CHUNK_SIZE = 500
+
+# Roles que ven todas las tareas de sus tableros (Agente solo las asignadas)
+_ROLES_WITH_BOARD_TASKS = ("Administrador", "Manager", "Supervisor", "Visualizador")
+
+_task_search_fts = table("task_search_fts", column("rowid"))
+
+
+def _join_text(parts: Iterable[Optional[str]]) -> str:
+    return " ".join(part for part in parts if part)
+
+
+def refresh_search_documents(db: Session, task_ids: Iterable[int], chunk_size: int = REFRESH_CHUNK_SIZE) -> int:
+    """
+    Regenerar el documento de búsqueda de las tareas indicadas
+    
+    Lee título, descripción y el historial completo (dos consultas por
+    cada chunk_size tareas) y reemplaza las filas de
+    task_search_documents; el tsvector / FTS5 se actualiza en la base.
+    Hace flush antes para incluir los cambios pendientes de la sesión.
+    El commit queda a cargo de quien llama.
+    
+    Returns:
+        Cantidad de documentos escritos
+    """
+    task_ids = sorted(set(task_ids))
+    if not task_ids:
+        return 0
+    
+    db.flush()
+    written = 0
+    
+    for start in range(0, len(task_ids), chunk_size):
+        chunk = task_ids[start:start + chunk_size]
+        
+        documents: Dict[int, dict] = {}
+        for task_id, title, description in db.query(Task.id, Task.title, Task.description).filter(Task.id.in_(chunk)):
+            documents[task_id] = {"task_id": task_id, "title": title, "parts": [description]}
+        
+        comments = db.query(TaskEvent.task_id, TaskEvent.doc).filter(
+            TaskEvent.task_id.in_(chunk),
+            TaskEvent.doc.isnot(None)
+        ).order_by(TaskEvent.task_id, TaskEvent.id)
+        for task_id, doc in comments:
+            if task_id in documents:
+                documents[task_id]["parts"].append(doc)
+        
+        db.execute(delete(TaskSearchDocument).where(TaskSearchDocument.task_id.in_(chunk)))
+        if documents:
+            db.execute(insert(TaskSearchDocument), [
+                {"task_id": d["task_id"], "title": d["title"], "content": _join_text(d["parts"])}
+                for d in documents.values()
+            ])
+        written += len(documents)
+    
+    return written
+
+
+def append_search_text(db: Session, task_id: int, text: Optional[str]) -> None:
+    """
+    Agregar un comentario nuevo al documento de búsqueda de la tarea
+    
+    Un UPDATE que concatena el texto, sin releer el historial. Si la
+    tarea todavía no tiene documento (no se reindexó) no hace nada.
+    """
+    if not text:
+        return
+    db.execute(
+        update(TaskSearchDocument)
+        .where(TaskSearchDocument.task_id == task_id)
+        .values(content=TaskSearchDocument.content + " " + text)
+    )
+
+
+def reindex_all(db: Session, batch_size: int = REFRESH_CHUNK_SIZE) -> int:
+    """
+    Regenerar los documentos de todas las tareas (y borrar los huérfanos)
+    
+    Para bases creadas antes del índice o con create_all. En SQLite crea
+    además task_search_fts y sus triggers si faltan y reconstruye el
+    índice FTS5 al final. Hace commit por lote.
+    
+    Returns:
+        Cantidad de documentos escritos
+    """
+    sqlite = db.get_bind().dialect.name == "sqlite"
+    if sqlite:
+        create_sqlite_search_index(db.connection())
+    
+    db.execute(delete(TaskSearchDocument).where(TaskSearchDocument.task_id.notin_(select(Task.id))))
+    db.commit()
+    
+    written = 0
+    last_id = 0
+    while True:
+        task_ids = [task_id for (task_id,) in db.query(Task.id).filter(
+            Task.id > last_id
+        ).order_by(Task.id).limit(batch_size)]
+        if not task_ids:
+            break
+        written += refresh_search_documents(db, task_ids, chunk_size=batch_size)
+        db.commit()
+        last_id = task_ids[-1]
+    
+    if sqlite:
+        db.execute(text("INSERT INTO task_search_fts(task_search_fts) VALUES ('rebuild')"))
+        db.commit()
+    
+    return written
+
+
+def _fts5_query(q: str) -> str:
+    """Términos de q como frases literales de FTS5 (sin operadores), unidos con AND"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def _match_and_rank(db: Session, q: str):
+    """
+    Condición de coincidencia, puntaje (mayor es mejor) y join extra según el motor
+    
+    - Postgres: websearch_to_tsquery contra search_vector (índice GIN),
+      ordenado con ts_rank_cd (el título pesa más que el contenido)
+    - SQLite: MATCH contra task_search_fts, ordenado con bm25
+    - Otros: LIKE sobre título y contenido, sin ranking
+    """
+    dialect = db.get_bind().dialect.name
+    
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), q)
+        vector = literal_column("task_search_documents.search_vector")
+        return vector.op("@@")(query), func.ts_rank_cd(vector, query), None
+    
+    if dialect == "sqlite":
+        fts = literal_column("task_search_fts")
+        return (
+            fts.op("MATCH")(_fts5_query(q)),
+            # bm25 es menor cuanto mejor; título con 4 veces el peso del contenido
+            -func.bm25(fts, 4.0, 1.0),
+            (_task_search_fts, _task_search_fts.c.rowid == TaskSearchDocument.task_id)
+        )
+    
+    pattern = f"%{q}%"
+    match = or_(TaskSearchDocument.title.ilike(pattern), TaskSearchDocument.content.ilike(pattern))
+    return match, literal_column("0.0"), None
+
+
+def search_tasks(
+    db: Session,
+    user: User,
+    q: str,
+    board_id: Optional[int] = None,
+    limit: int = 20,
+    offset: int = 0,
+    include_total: bool = False
+) -> Tuple[List[Tuple[int, float]], bool, Optional[int]]:
+    """
+    Buscar tareas por texto, ordenadas por relevancia
+    
+    La coincidencia, el orden y los permisos se resuelven en una sola
+    consulta: tableros de get_user_boards (user_board_ids_select) y, para
+    Agente, solo sus tareas asignadas, igual que GET /tasks.
+    
+    Returns:
+        (lista de (task_id, puntaje), si hay más resultados, total o None)
+    """
+    role_name = user.role.name if user.role else None
+    if not q.split() or role_name not in _ROLES_WITH_BOARD_TASKS + ("Agente",):
+        return [], False, 0 if include_total else None
+    
+    match, rank, fts_join = _match_and_rank(db, q)
+    
+    stmt = select(TaskSearchDocument.task_id, rank.label("rank")).select_from(TaskSearchDocument)
+    if fts_join is not None:
+        stmt = stmt.join(*fts_join)
+    stmt = stmt.join(Task, Task.id == TaskSearchDocument.task_id).where(
+        match,
+        Task.board_id.in_(PermissionChecker.user_board_ids_select(user))
+    )
+    
+    if board_id:
+        stmt = stmt.where(Task.board_id == board_id)
+    if role_name == "Agente":
+        stmt = stmt.where(Task.assigned_to_id == user.id)
+    
+    total = None
+    if include_total:
+        total = db.execute(select(func.count()).select_from(stmt.subquery())).scalar()
+    
+    # Una fila extra indica si hay página siguiente
+    rows = db.execute(
+        stmt.order_by(rank.desc(), TaskSearchDocument.task_id.desc()).limit(limit + 1).offset(offset)
+    ).all()
+    
+    hits = [(task_id, float(score or 0)) for task_id, score in rows[:limit]]
+    return hits, len(rows) > limit, total